@@ -0,0 +1,143 @@
+"""Streaming reply benchmark for the AI Assistant against a fake Gemini stream.
+
+The fake client yields a fixed reply in small chunks with a delay before
+each one, the way generate_content_stream does. Timed are the first draw
+(what the user waits for) and the whole reply through render_stream.
+
+Before timing, check_streaming asserts that chunks are assembled in order
+with the cursor only on intermediate draws, that a stream cut off
+mid-reply raises after showing the partial text and counts against the
+circuit breaker, and that a client without streaming falls back to a
+single generate_content reply.
+
+    python benchmarks/bench_assistant.py [n_chunks] [chunk_latency_ms]
+"""
+import os
+import sys
+import time
+
+from harness import measure, print_results, result
+
+os.environ["SENTIMENT_CACHE_DB"] = ""  # memory-only cache, nothing written to data/
+
+import circuit_breaker
+from assistant import CURSOR, render_stream, stream_reply
+
+
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeStreamModels:
+    """generate_content_stream yielding ``chunks``; raises ``error`` after ``fail_after`` of them."""
+
+    def __init__(self, chunks, latency: float = 0.0, fail_after: int = None, error: Exception = None):
+        self.chunks = list(chunks)
+        self.latency = latency
+        self.fail_after = fail_after
+        self.error = error or ConnectionError("stream reset by peer")
+
+    def generate_content_stream(self, model, contents):
+        for i, text in enumerate(self.chunks):
+            if i == self.fail_after:
+                raise self.error
+            if self.latency:
+                time.sleep(self.latency)
+            yield _Chunk(text)
+
+
+class FakeBlockingModels:
+    """A client without streaming: only generate_content, answering in one piece."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.calls = 0
+
+    def generate_content(self, model, contents):
+        self.calls += 1
+        return _Chunk(self.text)
+
+
+class FakeClient:
+    def __init__(self, models):
+        self.models = models
+
+
+def check_streaming():
+    breaker = circuit_breaker.get("gemini")
+    breaker.reset()
+
+    # chunks arrive in order; empty ones are skipped; only the final draw drops the cursor
+    drawn = []
+    client = FakeClient(FakeStreamModels(["Buy ", "", "TCS ", "on ", "dips."]))
+    text = render_stream(stream_reply("q", client=client), drawn.append, interval=0.0)
+    assert text == "Buy TCS on dips.", text
+    assert drawn[0] == "Buy " + CURSOR and drawn[-1] == text, drawn
+    assert all(d.endswith(CURSOR) for d in drawn[:-1]) and drawn[-2] == text + CURSOR, drawn
+
+    # a stream cut off mid-reply: the partial text was shown, the error reaches the caller
+    drawn = []
+    client = FakeClient(FakeStreamModels(["Hold ", "for ", "now."], fail_after=2))
+    try:
+        render_stream(stream_reply("q", client=client), drawn.append, interval=0.0)
+        raise AssertionError("mid-stream error was swallowed")
+    except ConnectionError:
+        pass
+    assert drawn[-1] == "Hold for " + CURSOR, drawn
+    assert breaker.stats()["failures"] == 1, breaker.stats()
+
+    # no generate_content_stream: one blocking call, the whole reply as one chunk
+    models = FakeBlockingModels("Sell INFY.")
+    drawn = []
+    text = render_stream(stream_reply("q", client=FakeClient(models)), drawn.append)
+    assert text == "Sell INFY." and models.calls == 1 and drawn == ["Sell INFY." + CURSOR, "Sell INFY."], drawn
+    assert breaker.stats()["failures"] == 0, "a good reply should close the breaker"
+
+    # open breaker: refused before the client is touched
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    models = FakeBlockingModels("unused")
+    try:
+        next(stream_reply("q", client=FakeClient(models)))
+        raise AssertionError("an open breaker let the call through")
+    except RuntimeError:
+        pass
+    assert models.calls == 0
+    breaker.reset()
+
+
+def run(quick: bool = False, n: int = None, latency: float = 0.002):
+    n = n or (50 if quick else 200)
+    repeat = 3 if quick else 5
+    check_streaming()
+    client = FakeClient(FakeStreamModels([f"word{i} " for i in range(n)], latency=latency))
+    first_draw = []
+
+    def reply():
+        started = time.perf_counter()
+        first_draw.append(None)
+
+        def show(text):
+            if first_draw[-1] is None:
+                first_draw[-1] = time.perf_counter() - started
+
+        render_stream(stream_reply("q", client=client), show)
+
+    full = measure(reply, repeat)
+    ttft = {"best": min(first_draw), "median": sorted(first_draw)[len(first_draw) // 2], "rounds": repeat}
+    params = {"chunks": n, "chunk_latency_ms": latency * 1000}
+    return [
+        result("stream_first_draw", ttft, **params),
+        result("stream_full_reply", full, ops=n, **params),
+    ]
+
+
+def main(n: int = 200, latency_ms: float = 2.0):
+    print(f"{n} chunks, {latency_ms:g}ms per chunk")
+    print_results(run(n=n, latency=latency_ms / 1000))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+         float(sys.argv[2]) if len(sys.argv) > 2 else 2.0)
@@ -0,0 +1,198 @@
+"""HybridNewsFetcher.fetch benchmark against a local HTTP fixture server.
+
+A threaded http.server on 127.0.0.1 serves a small RSS feed per symbol
+with an ETag (plus an h3-only quote page for symbols whose feed is empty),
+so the fetch path runs end to end without touching the internet. Three
+scenarios are timed:
+
+* rss_cold: validators and parsed feeds cleared, every feed a full 200,
+* rss_not_modified: the same symbols again, every feed a 304,
+* scrape_fallback: empty feeds that fall through to the quote page.
+
+Before timing, check_limits asserts against a slow fixture that a fetch
+takes one latency round per PER_HOST_LIMIT symbols, never has more than
+PER_HOST_LIMIT requests in flight at the server, and returns the mock
+text at the deadline.
+
+    python benchmarks/bench_fetcher.py [n_symbols] [latency_ms]
+"""
+import hashlib
+import math
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from harness import measure, print_results, result
+
+import http_client
+import ingestion
+from ingestion import HybridNewsFetcher
+
+RSS_ITEMS = 5
+CHECK_LATENCY = 0.2  # seconds per response while checking concurrency and the deadline
+WATCHLIST_SIZE = 38  # the app's default watchlist
+
+
+def _rss(sym: str, items: int) -> bytes:
+    entries = "".join(
+        f"<item><title>{sym} headline {i}: shares rally on strong earnings</title>"
+        f"<link>http://127.0.0.1/{sym}/{i}</link></item>"
+        for i in range(items)
+    )
+    return (f'<?xml version="1.0"?><rss version="2.0"><channel><title>{sym}</title>'
+            f"{entries}</channel></rss>").encode("utf-8")
+
+
+def _quote_page(sym: str) -> bytes:
+    return "".join(f"<h3>{sym} story {i}</h3>" for i in range(RSS_ITEMS)).encode("utf-8")
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real feeds
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    latency = 0.0
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.in_flight += 1
+            self.server.peak = max(self.server.peak, self.server.in_flight)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            self._respond()
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+    def _respond(self):
+        url = urlparse(self.path)
+        sym = parse_qs(url.query).get("s", [""])[0]
+        if url.path == "/rss":
+            body = _rss(sym, 0 if sym.startswith("EMPTY") else RSS_ITEMS)
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self._send(body, "application/rss+xml", etag)
+        elif url.path == "/quote":
+            self._send(_quote_page(sym), "text/html")
+        else:
+            self.send_error(404)
+
+    def _send(self, body: bytes, ctype: str, etag: str = None):
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_fixture_server(latency: float = 0.0) -> ThreadingHTTPServer:
+    handler = type("Handler", (FixtureHandler,), {"latency": latency})
+    # listen backlog big enough that a whole watchlist can connect at once
+    server_class = type("FixtureServer", (ThreadingHTTPServer,), {"request_queue_size": 128})
+    server = server_class(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.in_flight = server.peak = 0  # concurrent requests being served, and the most seen
+    threading.Thread(target=server.serve_forever, name="bench-fixture", daemon=True).start()
+    return server
+
+
+def _forget_feeds():
+    http_client._validators.clear()
+    ingestion._parsed_feeds.clear()
+
+
+def _timed_fetch(fetcher: HybridNewsFetcher):
+    _forget_feeds()
+    t0 = time.perf_counter()
+    texts = fetcher.fetch()
+    return texts, time.perf_counter() - t0
+
+
+def check_limits(latency: float = CHECK_LATENCY):
+    """Assert the per-host cap, the round-based wall time and the deadline against a slow fixture."""
+    server = start_fixture_server(latency)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    limit = ingestion.PER_HOST_LIMIT
+
+    def fetcher(prefix, n, **kwargs):
+        return HybridNewsFetcher([f"{prefix}{i}.NS" for i in range(n)], rss_url=base + "/rss?s={sym}",
+                                 quote_page_url=base + "/quote?s={sym}", **kwargs)
+
+    try:
+        # one full round of symbols shares a single latency round
+        texts, elapsed = _timed_fetch(fetcher("ROUND", limit))
+        assert all("headline" in t for t in texts.values()), "fixture feeds were not used"
+        assert latency <= elapsed < 2 * latency, f"{limit} symbols took {elapsed:.2f}s at {latency}s latency"
+
+        # a whole watchlist: one round per `limit` symbols, never more than `limit` in flight
+        server.peak = 0
+        texts, elapsed = _timed_fetch(fetcher("WATCH", WATCHLIST_SIZE))
+        rounds = math.ceil(WATCHLIST_SIZE / limit)
+        assert all("headline" in t for t in texts.values()), "watchlist fetch fell back to mock text"
+        assert elapsed < (rounds + 1) * latency, f"{WATCHLIST_SIZE} symbols took {elapsed:.2f}s, {rounds} rounds expected"
+        assert server.peak <= limit, f"{server.peak} concurrent requests to one host, limit {limit}"
+
+        # nothing answers before the deadline: every symbol gets the mock text, on time
+        deadline = latency / 2
+        texts, elapsed = _timed_fetch(fetcher("LATE", limit, deadline=deadline))
+        assert all(t == " ".join(ingestion.MOCK_HEADLINES) for t in texts.values()), "deadline was not applied"
+        assert elapsed < deadline + latency / 4, f"fetch with a {deadline}s deadline took {elapsed:.2f}s"
+        time.sleep(latency)  # let the abandoned requests release their host slots
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def run(quick: bool = False, n: int = None, latency: float = 0.0):
+    n = n or (20 if quick else 100)
+    repeat = 3 if quick else 5
+    ingestion.logger.disabled = True  # one INFO line per symbol would dominate the timing
+    check_limits()
+    server = start_fixture_server(latency)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        def fetcher(prefix):
+            return HybridNewsFetcher([f"{prefix}{i}.NS" for i in range(n)],
+                                     rss_url=base + "/rss?s={sym}", quote_page_url=base + "/quote?s={sym}")
+
+        live = fetcher("SYM")
+        texts = live.fetch()
+        assert all("headline" in t for t in texts.values()), "fixture feeds were not used"
+
+        cold = measure(live.fetch, repeat, setup=_forget_feeds)
+        live.fetch()
+        not_modified = measure(live.fetch, repeat)
+        scrape = measure(fetcher("EMPTY").fetch, repeat, setup=_forget_feeds)
+    finally:
+        server.shutdown()
+        server.server_close()
+        ingestion.logger.disabled = False
+    params = {"symbols": n, "latency_ms": latency * 1000}
+    return [
+        result("fetch_rss_cold", cold, ops=n, **params),
+        result("fetch_rss_not_modified", not_modified, ops=n, **params),
+        result("fetch_scrape_fallback", scrape, ops=n, **params),
+    ]
+
+
+def main(n: int = 100, latency_ms: float = 0.0):
+    print(f"{n} symbols, fixture latency {latency_ms:g}ms")
+    print_results(run(n=n, latency=latency_ms / 1000))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+         float(sys.argv[2]) if len(sys.argv) > 2 else 0.0)
@@ -0,0 +1,165 @@
+"""analyze_text / analyze_texts benchmark against a stubbed Gemini client.
+
+The stub answers instantly with valid JSON, so the numbers are the
+engine's own overhead (prompt building, parsing, caching, metrics) with
+network latency taken out. Pass a latency to simulate a slow model.
+
+Before timing, check_dispatcher_quota drives LLMDispatcher against a stub
+that rejects calls over its quota (as Gemini answers 429), on a virtual
+clock, and asserts that no call is rejected and that no token is spent
+when no client is configured.
+
+    python benchmarks/bench_llm.py [n_texts] [latency_ms]
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from harness import measure, print_results, result
+from bench_sentiment import make_headlines
+
+os.environ["SENTIMENT_CACHE_DB"] = ""  # memory-only cache, nothing written to data/
+
+import sentiment_engine
+from llm_dispatcher import LLMDispatcher, TokenBucket, quota_bucket
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModels:
+    """Mimics client.models.generate_content for single and batch prompts."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def generate_content(self, model, contents, config=None):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if "JSON array of items" in contents:
+            items = json.loads(contents[contents.index("Items:\n") + len("Items:\n"):])
+            return _Response(json.dumps([{"index": it["index"], "score": 0.25, "summary": "Stub."} for it in items]))
+        return _Response('{"score": 0.25, "summary": "Stub."}')
+
+
+class QuotaStubModels(StubModels):
+    """Rejects any call beyond ``limit`` in a rolling ``window`` of ``clock`` time, like a 429."""
+
+    def __init__(self, limit: int, window: float, clock):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self.clock = clock
+        self.rejected = 0
+        self._recent = deque()
+        self._lock = threading.Lock()
+
+    def generate_content(self, model, contents, config=None):
+        with self._lock:
+            now = self.clock()
+            while self._recent and self._recent[0] <= now - self.window:
+                self._recent.popleft()
+            if len(self._recent) >= self.limit:
+                self.rejected += 1
+                raise RuntimeError("429 RESOURCE_EXHAUSTED")
+            self._recent.append(now)
+        return super().generate_content(model, contents, config)
+
+
+class VirtualClock:
+    """Time that only moves when a caller sleeps, so quota checks run instantly."""
+
+    def __init__(self):
+        self.now = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self) -> float:
+        with self._lock:
+            return self.now
+
+    def sleep(self, seconds: float):
+        with self._lock:
+            self.now += seconds
+
+
+class StubClient:
+    def __init__(self, latency: float = 0.0):
+        self.models = StubModels(latency)
+
+
+class _StubTypes:
+    # google-genai not installed: the config object is only handed to the stub
+    GenerateContentConfig = dict
+
+
+def install_stub(latency: float = 0.0) -> StubClient:
+    client = StubClient(latency)
+    sentiment_engine.client = client
+    sentiment_engine.get_client()  # loads the SDK types if installed, keeps the stub
+    if sentiment_engine.types is None:
+        sentiment_engine.types = _StubTypes
+    return client
+
+
+def check_dispatcher_quota(limit: int = 10, window: float = 60.0, n: int = 60):
+    """Assert the dispatcher keeps a quota-enforcing client under its limit, and idles without one."""
+    clock = VirtualClock()
+    client = install_stub()
+    client.models = QuotaStubModels(limit, window, clock)
+    bucket = quota_bucket(limit, window)
+    bucket._clock, bucket._sleep, bucket._updated = clock, clock.sleep, clock()
+    texts = {f"T{i}": f"Quota check headline {i}" for i in range(n)}
+
+    sentiment_engine._cache.clear()
+    results = LLMDispatcher(bucket).run(texts)
+    assert client.models.rejected == 0, f"{client.models.rejected} calls went over the quota"
+    assert client.models.calls == n and all(r["summary"] == "Stub." for r in results.values())
+    assert clock() >= (n - bucket.capacity) / bucket.rate - 1e-6, "calls were not spread over the window"
+
+    # no client: every text falls back to the keyword scorer without waiting on an empty bucket
+    sentiment_engine.client = None
+    sentiment_engine._cache.clear()
+    empty = TokenBucket(rate=1e-6, capacity=1.0)
+    empty.try_acquire()
+    t0 = time.perf_counter()
+    results = LLMDispatcher(empty).run(texts, timeout=5.0)
+    assert len(results) == n and time.perf_counter() - t0 < 1.0, "fallback calls waited for tokens"
+    assert empty.available() < 1, "a fallback call took a token"
+    sentiment_engine._cache.clear()
+
+
+def run(quick: bool = False, n: int = None, latency: float = 0.0):
+    n = n or (500 if quick else 5_000)
+    repeat = 3 if quick else 5
+    check_dispatcher_quota()
+    client = install_stub(latency)
+    texts = [f"{h} #{i}" for i, h in enumerate(make_headlines(n, seed=11))]
+    clear = sentiment_engine._cache.clear
+
+    cold = measure(lambda: [sentiment_engine.analyze_text(t) for t in texts], repeat, setup=clear)
+    warm = measure(lambda: [sentiment_engine.analyze_text(t) for t in texts], repeat)
+    batch = measure(lambda: sentiment_engine.analyze_texts(texts), repeat, setup=clear)
+    assert client.models.calls and all(sentiment_engine.analyze_text(t)["summary"] == "Stub." for t in texts)
+    return [
+        result("analyze_text_uncached", cold, ops=n, texts=n, latency_ms=latency * 1000),
+        result("analyze_text_cached", warm, ops=n, texts=n, latency_ms=latency * 1000),
+        result("analyze_texts_batch_uncached", batch, ops=n, texts=n, latency_ms=latency * 1000,
+               requests_per_round=len(sentiment_engine._pack_batches(texts))),
+    ]
+
+
+def main(n: int = 5_000, latency_ms: float = 0.0):
+    print(f"{n:,} texts, stub latency {latency_ms:g}ms")
+    print_results(run(n=n, latency=latency_ms / 1000))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000,
+         float(sys.argv[2]) if len(sys.argv) > 2 else 0.0)
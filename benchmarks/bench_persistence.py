@@ -0,0 +1,75 @@
+"""Trade execution and CSV persistence benchmark at growing history sizes.
+
+For each history size a synthetic data/activity_log.csv is written to a
+temporary directory and migrated into the trade journal, then:
+
+* apply_order: a burst of alternating buys and sells on the booted
+  portfolio (journal writes plus the periodic CSV compaction included),
+* load_trades_from_csv: parsing the whole activity log into a TradeLog,
+* log_trades_to_csv / sync_to_csv: appending a block of trades to the log
+  and rewriting the holdings and account snapshots.
+
+    python benchmarks/bench_persistence.py [n_trades ...]
+"""
+import sys
+
+from harness import measure, print_results, result, scratch_dir
+from bench_portfolio_boot import SYMBOLS, write_activity_log
+
+from portfolio import Portfolio
+
+SIZES = (10_000, 100_000, 1_000_000)
+QUICK_SIZES = (10_000, 100_000)
+ORDERS = 1_000  # orders per apply_order round
+APPEND_ROWS = 1_000  # rows per log_trades_to_csv round
+
+
+def _orders(n: int):
+    for i in range(n):
+        yield {"symbol": SYMBOLS[i % len(SYMBOLS)], "action": "buy" if i % 2 == 0 else "sell", "quantity": 1.0}
+
+
+def bench_history(n: int, repeat: int):
+    with scratch_dir():
+        write_activity_log("data/activity_log.csv", n)
+        port = Portfolio(cash=1e12)
+
+        def apply_burst():
+            for order in _orders(ORDERS):
+                port.apply_order(order, sentiment_score=0.5, manual_price=100.0,
+                                 timestamp="2024-01-01T00:00:00")
+            port.compact()
+
+        applied = measure(apply_burst, repeat)
+
+        reader = Portfolio(persist=False)
+        loaded = measure(reader.load_trades_from_csv, repeat)
+        assert len(reader.trades) >= n
+
+        rows = port.trades.tail(APPEND_ROWS)
+        appended = measure(lambda: port.log_trades_to_csv(rows), repeat)
+        synced = measure(port.sync_to_csv, repeat)
+
+    return [
+        result("apply_order", applied, ops=ORDERS, history=n),
+        result("load_trades_from_csv", loaded, ops=n, history=n),
+        result("log_trades_to_csv", appended, ops=APPEND_ROWS, history=n),
+        result("sync_to_csv", synced, history=n, positions=len(port.positions)),
+    ]
+
+
+def run(quick: bool = False, sizes=None):
+    sizes = sizes or (QUICK_SIZES if quick else SIZES)
+    repeat = 3 if quick else 5
+    results = []
+    for n in sizes:
+        results += bench_history(n, repeat)
+    return results
+
+
+def main(sizes=SIZES):
+    print_results(run(sizes=sizes))
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or SIZES)
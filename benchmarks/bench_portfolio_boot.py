@@ -0,0 +1,98 @@
+"""Boot-time benchmark for Portfolio with a large activity log.
+
+Builds a synthetic data/activity_log.csv in a temporary directory and times
+a first boot (one-off migration of the CSV into the trade journal) and a
+warm boot (journal already present, history loaded lazily). For reference
+it also times the old iterrows loader on a slice and extrapolates.
+A large log is migrated in the background, so the first boot is timed
+both until Portfolio() returns and until the import has committed.
+
+    python benchmarks/bench_portfolio_boot.py [n_trades]
+"""
+import glob
+import os
+import random
+import sys
+import time
+
+from harness import measure, print_results, result, scratch_dir
+
+import pandas as pd
+
+from portfolio import Portfolio
+
+SYMBOLS = ["RELIANCE.NS", "TCS.NS", "INFY.NS", "ITC.NS", "SBIN.NS", "LT.NS", "WIPRO.NS", "ONGC.NS"]
+LEGACY_SAMPLE = 50_000
+
+
+def write_activity_log(path: str, n: int, seed: int = 7):
+    rng = random.Random(seed)
+    qty = [round(rng.uniform(1, 50), 2) for _ in range(n)]
+    price = [round(rng.uniform(100, 3000), 2) for _ in range(n)]
+    pd.DataFrame({
+        "symbol": [rng.choice(SYMBOLS) for _ in range(n)],
+        "action": [rng.choice(("buy", "sell")) for _ in range(n)],
+        "quantity": qty,
+        "price": price,
+        "timestamp": pd.date_range("2020-01-01", periods=n, freq="min").strftime("%Y-%m-%dT%H:%M:%S"),
+        "sentiment": [round(rng.uniform(-1, 1), 3) for _ in range(n)],
+        "value": [q * p for q, p in zip(qty, price)],
+    }).to_csv(path, index=False)
+
+
+def legacy_iterrows_load(path: str, nrows: int) -> float:
+    t0 = time.perf_counter()
+    df = pd.read_csv(path, nrows=nrows)
+    for _, row in df.iterrows():
+        (str(row["symbol"]), str(row["action"]), float(row["quantity"]), float(row["price"]),
+         str(row["timestamp"]), float(row["sentiment"]))
+    return time.perf_counter() - t0
+
+
+def run(quick: bool = False, n: int = None):
+    n = n or (100_000 if quick else 1_000_000)
+    repeat = 1 if quick else 3
+    with scratch_dir():
+        write_activity_log("data/activity_log.csv", n)
+
+        sample = min(n, LEGACY_SAMPLE)
+        legacy = legacy_iterrows_load("data/activity_log.csv", sample) * n / sample
+
+        booted = []
+
+        def drop_journal():
+            # an earlier round may still be migrating in the background
+            for port in booted:
+                port.finish_migration()
+            for path in glob.glob("data/journal.db*"):
+                os.remove(path)
+
+        first = measure(lambda: booted.append(Portfolio()), repeat, setup=drop_journal)
+        booted[-1].finish_migration()
+        migrated = measure(lambda: Portfolio().finish_migration(), repeat, setup=drop_journal)
+        warm = measure(Portfolio, repeat)
+        port = Portfolio()
+
+        def reads():
+            recent = port.get_trades(limit=50)
+            assert port.snapshot()["trades_count"] == n and len(recent) == 50
+
+        read = measure(reads, repeat)
+
+    return [
+        result("boot_legacy_iterrows_extrapolated", {"best": legacy, "median": legacy, "rounds": 1},
+               trades=n, sample=sample),
+        result("boot_first_csv_migration", first, trades=n),
+        result("first_csv_migration_committed", migrated, trades=n),
+        result("boot_warm_journal", warm, trades=n),
+        result("snapshot_and_recent_trades", read, trades=n),
+    ]
+
+
+def main(n: int = 1_000_000):
+    print(f"{n:,} trades")
+    print_results(run(n=n))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
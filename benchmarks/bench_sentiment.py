@@ -0,0 +1,56 @@
+"""Throughput benchmark for the keyword sentiment scorer.
+
+Compares scoring headlines one at a time through analyze_text_sentiment
+(the old hot path in aggregate_sentiments) with a single score_texts call.
+
+    python benchmarks/bench_sentiment.py [n_headlines]
+"""
+import random
+import sys
+
+from harness import measure, print_results, result
+from sentiment import analyze_text_sentiment, score_texts  # noqa: E402
+
+WORDS = (
+    "market stocks rally earnings outlook guidance shares investors quarter revenue "
+    "good excellent bullish buy sell bad bearish not never weak strong selling buying"
+).split()
+
+# Words that only look like lexicon terms must not score
+LOOKALIKES = {
+    "Staff get a new badge": 0.0,
+    "Goodbye to gains": 0.0,
+    "The bestseller tops the charts": 0.0,
+    "Board approves a buyback": 0.0,
+    "Promoters sold shares": -0.6,
+    "Buyers return to the market": 0.3,
+}
+
+
+def make_headlines(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 14))).capitalize() for _ in range(n)]
+
+
+def run(quick: bool = False, n: int = None):
+    n = n or (10_000 if quick else 100_000)
+    headlines = make_headlines(n)
+    for text, expected in LOOKALIKES.items():
+        assert analyze_text_sentiment(text) == expected, text
+    assert list(score_texts(list(LOOKALIKES))) == list(LOOKALIKES.values())
+    assert all(abs(a - b) < 1e-9 for a, b in zip(map(analyze_text_sentiment, headlines), score_texts(headlines)))
+    repeat = 3 if quick else 5
+    return [
+        result("analyze_text_sentiment", measure(lambda: [analyze_text_sentiment(h) for h in headlines], repeat),
+               ops=n, headlines=n),
+        result("score_texts", measure(lambda: score_texts(headlines), repeat), ops=n, headlines=n),
+    ]
+
+
+def main(n: int = 100_000):
+    print(f"{n:,} headlines")
+    print_results(run(n=n))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
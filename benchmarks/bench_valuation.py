@@ -0,0 +1,84 @@
+"""Portfolio valuation benchmark over large books.
+
+Builds in-memory portfolios (no disk I/O) holding thousands of positions
+priced by a static provider and times:
+
+* total_value: reading the running total,
+* quote_push: streaming one quote per position into the valuation,
+* revalue: re-seeding every position with one bulk price lookup,
+* reprice_loop: the old approach of pricing each position on every read,
+  kept as a baseline.
+
+    python benchmarks/bench_valuation.py [n_positions ...]
+"""
+import sys
+
+from harness import measure, print_results, result
+
+from portfolio import Portfolio, Position
+
+SIZES = (1_000, 10_000, 100_000)
+QUICK_SIZES = (1_000, 10_000)
+READS = 10_000  # total_value calls per round
+
+
+class StaticPrices:
+    """Provider answering every symbol from a fixed table."""
+
+    def __init__(self, prices):
+        self.prices = prices
+
+    def get_price(self, symbol):
+        return self.prices[symbol]
+
+    def get_many(self, symbols):
+        return {s: (self.prices[s], 0.0, 0.0) for s in symbols}
+
+
+def make_book(n: int) -> Portfolio:
+    symbols = [f"SYM{i:06d}.NS" for i in range(n)]
+    port = Portfolio(persist=False)
+    port.positions = {s: Position(s, 10.0 + i % 90, 100.0 + i % 400) for i, s in enumerate(symbols)}
+    port.price_provider = StaticPrices({s: 105.0 + i % 400 for i, s in enumerate(symbols)})
+    return port
+
+
+def bench_book(n: int, repeat: int):
+    port = make_book(n)
+    symbols = list(port.positions)
+    ticks = [(s, 106.0 + i % 400, 1.0, 0.9) for i, s in enumerate(symbols)]
+
+    def reads():
+        for _ in range(READS):
+            port.total_value()
+
+    def quote_push():
+        for tick in ticks:
+            port._on_quote(*tick)
+
+    def reprice_loop():
+        return port.cash + sum(pos.shares * port.get_price(sym) for sym, pos in port.positions.items())
+
+    return [
+        result("total_value", measure(reads, repeat), ops=READS, positions=n),
+        result("quote_push", measure(quote_push, repeat), ops=n, positions=n),
+        result("revalue", measure(port._revalue_positions, repeat), ops=n, positions=n),
+        result("reprice_loop_baseline", measure(reprice_loop, repeat), ops=1, positions=n),
+    ]
+
+
+def run(quick: bool = False, sizes=None):
+    sizes = sizes or (QUICK_SIZES if quick else SIZES)
+    repeat = 3 if quick else 5
+    results = []
+    for n in sizes:
+        results += bench_book(n, repeat)
+    return results
+
+
+def main(sizes=SIZES):
+    print_results(run(sizes=sizes))
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or SIZES)
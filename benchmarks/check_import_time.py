@@ -0,0 +1,78 @@
+"""Cold-import budget check for the core engine (everything except the UI).
+
+Imports the core modules in fresh interpreters and fails if the best time
+is over budget, or if any heavy dependency (pandas, the HTTP stack, the
+Gemini SDK, the UI libraries) gets pulled in at import time. Those are
+meant to load on first use. Prints the slowest modules from
+``python -X importtime`` to show where the time went.
+
+    python benchmarks/check_import_time.py [--budget 0.35] [--runs 5]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+CORE_MODULES = (
+    "portfolio", "valuation", "journal", "sentiment", "sentiment_engine",
+    "market_data", "llm_dispatcher", "sentinel", "metrics",
+)
+DEFERRED_MODULES = (
+    "pandas", "requests", "bs4", "feedparser", "dotenv", "google.genai",
+    "yfinance", "streamlit", "plotly",
+)
+DEFAULT_BUDGET = 0.35  # seconds, best of --runs cold imports
+TOP = 10  # slowest modules listed in the report
+
+_PROBE = f"""
+import json, sys, time
+t0 = time.perf_counter()
+import {", ".join(CORE_MODULES)}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {DEFERRED_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def probe():
+    """One cold import in a fresh interpreter: (result, per-module self times)."""
+    env = dict(os.environ, SENTIMENT_CACHE_DB="")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", _PROBE], cwd=SRC, env=env,
+                          capture_output=True, text=True, check=True)
+    selfs = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        selfs.append((int(own) / 1e6, name.strip()))
+    return json.loads(proc.stdout.strip().splitlines()[-1]), sorted(selfs, reverse=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Fail if the core engine imports too slowly.")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="seconds allowed for a cold import")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to try; the best run counts")
+    args = parser.parse_args(argv)
+
+    runs = [probe() for _ in range(args.runs)]
+    (best, selfs) = min(runs, key=lambda run: run[0]["seconds"])
+    loaded = sorted({m for run, _ in runs for m in run["loaded"]})
+
+    print(f"core import: {best['seconds'] * 1000:.0f}ms best of {args.runs} (budget {args.budget * 1000:.0f}ms)")
+    for seconds, name in selfs[:TOP]:
+        print(f"  {seconds * 1000:7.1f}ms  {name}")
+
+    failed = False
+    if best["seconds"] > args.budget:
+        print("FAIL: cold import is over budget")
+        failed = True
+    if loaded:
+        print(f"FAIL: imported eagerly, should load on first use: {', '.join(loaded)}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
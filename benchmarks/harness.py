@@ -0,0 +1,76 @@
+"""Shared timing and result-recording helpers for the benchmark scripts.
+
+Every benchmark module exposes ``run(quick=False)`` returning a list of
+result records built with ``result``; run_all.py collects them into one
+JSON file per run so numbers can be diffed across commits.
+"""
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+
+@contextmanager
+def scratch_dir():
+    """Run inside a throwaway working directory with an empty data/ folder."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.makedirs("data")
+        try:
+            yield tmp
+        finally:
+            os.chdir(cwd)
+
+
+def measure(func: Callable[[], object], repeat: int = 5, setup: Callable[[], object] = None) -> Dict:
+    """Time ``func`` ``repeat`` times (after an optional per-round ``setup``) and summarize."""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+    return {"best": min(times), "median": statistics.median(times), "rounds": repeat}
+
+
+def result(name: str, timing: Dict, ops: int = None, **params) -> Dict:
+    """One machine-readable record; ``ops`` adds a throughput figure (ops/s of the best round)."""
+    record = {"name": name, "params": params, **timing}
+    if ops is not None:
+        record["ops"] = ops
+        record["ops_per_sec"] = ops / timing["best"] if timing["best"] > 0 else float("inf")
+    return record
+
+
+def print_results(results: List[Dict]):
+    for r in results:
+        params = " ".join(f"{k}={v}" for k, v in r["params"].items())
+        rate = f"  {r['ops_per_sec']:14,.0f} ops/s" if "ops_per_sec" in r else ""
+        print(f"  {r['name']:<36} {params:<24} best {r['best']:9.4f}s  median {r['median']:9.4f}s{rate}")
+
+
+def environment() -> Dict:
+    """Where and on what code the numbers were taken."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
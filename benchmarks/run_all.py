@@ -0,0 +1,75 @@
+"""Run the offline benchmark suite and write the results as JSON.
+
+Everything runs locally: the LLM is a stub, news comes from a fixture HTTP
+server on 127.0.0.1 and persistence happens in temporary directories.
+Each run is written to benchmarks/results/<timestamp>_<commit>.json
+together with the environment it ran on; ``--compare`` prints the change
+in best time against an earlier result file.
+
+    python benchmarks/run_all.py [--quick] [--only llm,fetcher] [--compare benchmarks/results/OLD.json]
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+
+from harness import ROOT, environment, print_results
+
+SUITES = ("sentiment", "llm", "assistant", "fetcher", "persistence", "valuation", "portfolio_boot")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+
+def _key(record):
+    return record["suite"], record["name"], json.dumps(record["params"], sort_keys=True)
+
+
+def compare(results, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = {_key(r): r for r in json.load(f)["results"]}
+    print(f"\nvs {baseline_path}")
+    for r in results:
+        old = baseline.get(_key(r))
+        if old is None or not old["best"]:
+            continue
+        change = (r["best"] - old["best"]) / old["best"] * 100
+        params = " ".join(f"{k}={v}" for k, v in r["params"].items())
+        print(f"  {r['suite'] + '.' + r['name']:<48} {params:<24} {old['best']:9.4f}s -> {r['best']:9.4f}s  {change:+7.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the SentiraTrader benchmark suite.")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes and fewer rounds")
+    parser.add_argument("--only", default=None, help=f"comma-separated subset of: {', '.join(SUITES)}")
+    parser.add_argument("--out", default=None, help="result file (default: benchmarks/results/<timestamp>_<commit>.json)")
+    parser.add_argument("--compare", default=None, help="earlier result file to diff against")
+    args = parser.parse_args(argv)
+
+    suites = args.only.split(",") if args.only else SUITES
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(sorted(unknown))}")
+
+    env = environment()
+    results = []
+    for suite in suites:
+        print(f"[{suite}]")
+        records = importlib.import_module(f"bench_{suite}").run(quick=args.quick)
+        print_results(records)
+        results += [{"suite": suite, **r} for r in records]
+
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = env["timestamp"].replace(":", "").replace("-", "")[:15]
+        out = os.path.join(RESULTS_DIR, f"{stamp}_{env['commit'] or 'nogit'}.json")
+    with open(out, "w") as f:
+        json.dump({"environment": env, "quick": args.quick, "results": results}, f, indent=2)
+    print(f"\nwrote {out}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,28 @@
 import streamlit as st
 import pandas as pd
 import time
-import plotly.express as px
-import plotly.graph_objects as go
 from sentiment import fetch_mock_news
-from sentiment_engine import analyze_text
+from sentiment_engine import analyze_texts, cache_stats as sentiment_cache_stats
+from llm_dispatcher import ScanScheduler, get_dispatcher
 from portfolio import Portfolio
-from market_data import PriceCache, fetch_live_news_sentiments, fetch_market_overview
+from social_feed import FeedAggregates, FeedTail
+from mentions import symbol_index
+import metrics
+import circuit_breaker
+from assistant import CURSOR, render_stream, stream_reply
+from sentinel import DEFAULT_WATCHLIST, SCAN_INTERVAL as SENTINEL_INTERVAL, SCAN_TIMEOUT, SentinelStore
+from market_data import CACHE_EXPIRY, get_shared_cache, fetch_live_news_sentiments, fetch_market_overview
+import contextlib
 import math
 import os
 from dotenv import load_dotenv
 load_dotenv()
 
+
+if os.environ.get("METRICS_PORT"):
+    # Prometheus scrape target at http://127.0.0.1:$METRICS_PORT/metrics
+    metrics.start_http_server(int(os.environ["METRICS_PORT"]))
+
 def inject_custom_css():
     st.markdown("""
         <style>
@@ -208,6 +219,23 @@ def inject_custom_css():
     """, unsafe_allow_html=True)
 
 
+def next_move_card(ans: str) -> str:
+    """HTML card for a Next Move suggestion, colored by its leading BUY/SELL."""
+    ans = ans.strip()
+    
+    # Parse color formatting based on string start
+    color = "#555"
+    bg = "#f5f5f5"
+    if ans.upper().startswith("[BUY]") or ans.upper().startswith("BUY"):
+        color = "#4caf50"
+        bg = "#e8f5e9"
+    elif ans.upper().startswith("[SELL]") or ans.upper().startswith("SELL"):
+        color = "#e53935"
+        bg = "#ffebee"
+        
+    return f'<div style="padding: 16px; border-radius: 4px; border-left: 4px solid {color}; background-color: {bg}; color: #333; font-weight: 500; font-size: 14px;">Next Move Suggestion:<br><br>{ans}</div>'
+
+
 def render_sidebar_watchlist(port: Portfolio, symbols: list):
     st.sidebar.markdown(f"<div style='padding: 16px; font-size: 12px; color: #888;'>Watchlist ({len(symbols)}/50)</div>", unsafe_allow_html=True)
     
@@ -215,9 +243,9 @@ def render_sidebar_watchlist(port: Portfolio, symbols: list):
     search_q = st.sidebar.text_input("Search Company / Ticker", placeholder="e.g. NVIDIA or NVDA", key="wl_search_input")
     if st.sidebar.button("🔍 Search", use_container_width=True):
         if search_q.strip():
-            import requests
+            import http_client
             try:
-                res = requests.get(f"https://query2.finance.yahoo.com/v1/finance/search?q={search_q.strip()}", headers={'User-Agent': 'Mozilla/5.0'}).json()
+                res = http_client.get("https://query2.finance.yahoo.com/v1/finance/search", params={"q": search_q.strip()}).json()
                 quotes = res.get('quotes', [])
                 if quotes:
                     st.session_state.wl_search_results = [(q.get('symbol', ''), q.get('shortname', q.get('symbol', ''))) for q in quotes if 'symbol' in q][:5]
@@ -247,9 +275,17 @@ def render_sidebar_watchlist(port: Portfolio, symbols: list):
     
     # Re-fetch the updated list references if mutated
     symbols = list(st.session_state.watched_symbols)
+    quotes = port.price_provider.get_many(symbols)
+    
+    oldest = max((port.price_provider.get_age(s) for s in symbols), default=0.0)
+    if oldest > CACHE_EXPIRY:
+        st.sidebar.caption(f"Refreshing quotes (last update {oldest:.0f}s ago)")
+    for breaker in circuit_breaker.all_stats():
+        if breaker["state"] != circuit_breaker.CLOSED:
+            st.sidebar.caption(f"⚠️ {breaker['name']} unreachable, using fallbacks (next retry in {breaker['retry_in']:.0f}s)")
     
     for symbol in symbols:
-        price, chg_abs, chg_perc = port.price_provider.get_price_and_change(symbol)
+        price, chg_abs, chg_perc = quotes[symbol]
         
         color_cls = "green-text" if chg_abs > 0 else "red-text" if chg_abs < 0 else "neutral-text"
         arrow = "▲" if chg_abs > 0 else "▼" if chg_abs < 0 else ""
@@ -269,6 +305,8 @@ def render_sidebar_watchlist(port: Portfolio, symbols: list):
                     st.session_state.watched_symbols.remove(symbol)
                     st.rerun()
     
+    cache_stats = port.price_provider.stats()
+    st.sidebar.caption(f"Shared quote cache: {cache_stats['hit_rate']:.0%} hit rate · {cache_stats['fetches']} upstream fetches · {cache_stats['symbols']} symbols")
     st.sidebar.divider()
     
     st.sidebar.markdown("<div style='padding: 0 16px;'><strong style='font-size:12px;color:#666;'>AGENT CONTROLS</strong></div>", unsafe_allow_html=True)
@@ -292,28 +330,53 @@ def render_sidebar_watchlist(port: Portfolio, symbols: list):
 
     return fully_autonomous, auto_refresh
 
+def schedule_refresh(interval: int):
+    """Rerun the page every ``interval`` seconds.
+
+    A timed fragment does the waiting client-side, instead of parking a
+    server thread in time.sleep before each rerun.
+    """
+    @st.fragment(run_every=interval)
+    def tick():
+        # the first call happens during the full run itself; only timed reruns refresh
+        if time.time() - st.session_state.last_full_run >= interval - 1:
+            st.rerun()
+    tick()
+
+
 def main():
     st.set_page_config(page_title="Portfolio Tracker AI", layout="wide", initial_sidebar_state="expanded")
     inject_custom_css()
 
     # Initialize State
     if "portfolio" not in st.session_state:
-        st.session_state.portfolio = Portfolio()
-        st.session_state.portfolio.price_provider = PriceCache()
+        port = Portfolio()
+        quotes = get_shared_cache()
+        # Start revalidating before attaching the cache: seeding the valuation then serves
+        # cached (even stale, e.g. just after a restart) quotes instead of blocking on yfinance
+        quotes.watch(list(port.positions))
+        quotes.start_background_refresh()
+        port.price_provider = quotes
+        st.session_state.portfolio = port
     if "history" not in st.session_state:
         st.session_state.history = []
+    if "sentinel_store" not in st.session_state:
+        st.session_state.sentinel_store = SentinelStore()
+    if "social_tail" not in st.session_state:
+        st.session_state.social_tail = FeedTail()
+        st.session_state.social_aggregates = FeedAggregates()
     if "watched_symbols" not in st.session_state:
-        st.session_state.watched_symbols = [
-            "RELIANCE.NS", "TCS.NS", "HDFCBANK.NS", "INFY.NS", "ICICIBANK.NS", 
-            "SBIN.NS", "BHARTIARTL.NS", "ITC.NS", "HINDUNILVR.NS", "LT.NS", 
-            "BAJFINANCE.NS", "KOTAKBANK.NS", "AXISBANK.NS", "ASIANPAINT.NS", 
-            "MARUTI.NS", "SUNPHARMA.NS", "TITAN.NS", "ULTRACEMCO.NS", 
-            "WIPRO.NS", "NESTLEIND.NS", "HCLTECH.NS", "ONGC.NS", "ADANIENT.NS", 
-            "NTPC.NS", "POWERGRID.NS", "M&M.NS", "BAJAJFINSV.NS", "JSWSTEEL.NS", 
-            "TATASTEEL.NS", "COALINDIA.NS", "BRITANNIA.NS", "HINDALCO.NS", "TECHM.NS", 
-            "INDUSINDBK.NS", "EICHERMOT.NS", "DRREDDY.NS", "CIPLA.NS", "GRASIM.NS"
-        ] # Expanded for robust tracker look in Rupees
+        st.session_state.watched_symbols = list(DEFAULT_WATCHLIST) # Expanded for robust tracker look in Rupees
     port = st.session_state.portfolio
+    st.session_state.last_full_run = time.time()
+    # Only posts appended since the last rerun are read from disk
+    social_tail = st.session_state.social_tail
+    social_tail.poll()
+    sentinel_store = st.session_state.sentinel_store
+
+    # Keep quotes warm off the render path; the shared refresher exits on its own once every session goes idle
+    port.price_provider.watch(list(st.session_state.watched_symbols) + list(port.positions))
+    port.price_provider.start_background_refresh()
     snap = port.snapshot()
 
     # Render Header Custom CSS padding
@@ -355,11 +418,7 @@ def main():
              st.markdown('<div class="kite-card">', unsafe_allow_html=True)
              st.markdown('<div class="card-title">🤖 AI Trade Suggestions & Social Sentiment</div>', unsafe_allow_html=True)
              
-             try:
-                 with open("data/social_media.txt", "r") as f:
-                     social_chat = f.readlines()[-3:] # get latest 3
-             except:
-                 social_chat = ["[10:00 AM] @market_bot: Waiting for data stream..."]
+             social_chat = social_tail.recent(3) or ["[10:00 AM] @market_bot: Waiting for data stream..."] # get latest 3
                  
              st.markdown('<div style="font-size: 13px; color: #666; font-weight: 500; margin-bottom: 8px;">Latest Social Chatter:</div>', unsafe_allow_html=True)
              for chat in social_chat:
@@ -380,19 +439,12 @@ def main():
 
         # Lower Section: Holdings Summary
         num_holdings = len(snap['positions'])
-        total_inv = 0
-        total_curr = 0
-        
-        pie_data = [] # Data for interactive chart
-        
-        for sym, shares in snap['positions'].items():
-            price = port.get_price(sym)
-            val = shares * price
-            total_curr += val
-            total_inv += val * 1.05  
-            pie_data.append({"Symbol": sym, "Value": val})
+        # Running totals kept up to date by the portfolio's valuation engine
+        total_inv = snap['cost']
+        total_curr = snap['market_value']
+        pie_data = [{"Symbol": row.symbol, "Value": row.market_value} for row in port.position_values()] # Data for interactive chart
             
-        pnl = total_curr - total_inv
+        pnl = snap['unrealized_pnl']
         pnl_perc = (pnl / total_inv * 100) if total_inv > 0 else 0
         pnl_class = "pnl-profit" if pnl >= 0 else "pnl-loss"
         pnl_sign = "+" if pnl > 0 else ""
@@ -418,6 +470,7 @@ def main():
         
         # Interactive Asset Allocation Chart using Plotly
         if pie_data:
+            import plotly.express as px  # only paid for once there is something to chart
             df_pie = pd.DataFrame(pie_data)
             fig = px.pie(
                 df_pie, 
@@ -443,12 +496,13 @@ def main():
     # TAB 2: ACTIVITY LOG (Trade History mapped here)
     # -------------------------------------------------------------
     with t_orders:
-        if not port.trades:
+        if port.migrating:
+            st.info("Importing your activity log into the trade journal (one-time). Trade history appears when it finishes.")
+        elif not port.trades:
             st.info("No tracking activity recorded today")
         else:
-            trades = port.get_trades(limit=50)
-            df_trades = pd.DataFrame(trades)
-            df_trades['timestamp'] = pd.to_datetime(df_trades['timestamp']).dt.strftime('%H:%M:%S')
+            df_trades = port.trade_frame(limit=50)
+            df_trades['timestamp'] = df_trades['timestamp'].dt.strftime('%H:%M:%S')
             df_trades['action'] = df_trades['action'].str.upper()
             df_trades['Status'] = "COMPLETE"
             
@@ -497,27 +551,20 @@ def main():
 
             with st.chat_message("assistant"):
                 message_placeholder = st.empty()
-                with st.spinner("Gemini is thinking..."):
-                    try:
-                        from google import genai
-                        client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
-                        
-                        # Provide the LLM with the active portfolio logic so it actually knows the user
-                        system_context = f"You are an expert quantitative trader and financial advisor. The user's current portfolio snapshot is: {snap}. Be concise and professional."
-                        full_prompt = f"{system_context}\n\nUser Question: {prompt}"
-                        
-                        response = client.models.generate_content(
-                            model='gemini-2.5-flash',
-                            contents=full_prompt,
-                        )
-                        full_response = response.text
-                        message_placeholder.markdown(full_response)
-                        
-                        st.session_state.chat_messages.append({"role": "assistant", "content": full_response})
-                    except Exception as e:
-                        error_msg = f"Sorry, the Gemini API encountered an error: {e}"
-                        message_placeholder.error(error_msg)
-                        st.session_state.chat_messages.append({"role": "assistant", "content": error_msg})
+                message_placeholder.markdown(CURSOR)
+                try:
+                    # Provide the LLM with the active portfolio logic so it actually knows the user
+                    system_context = f"You are an expert quantitative trader and financial advisor. The user's current portfolio snapshot is: {snap}. Be concise and professional."
+                    full_prompt = f"{system_context}\n\nUser Question: {prompt}"
+                    
+                    # Tokens are drawn into the placeholder as they arrive
+                    full_response = render_stream(stream_reply(full_prompt, kind="chat"), message_placeholder.markdown)
+                    
+                    st.session_state.chat_messages.append({"role": "assistant", "content": full_response})
+                except Exception as e:
+                    error_msg = f"Sorry, the Gemini API encountered an error: {e}"
+                    message_placeholder.error(error_msg)
+                    st.session_state.chat_messages.append({"role": "assistant", "content": error_msg})
         st.markdown('</div>', unsafe_allow_html=True)
 
 
@@ -529,22 +576,16 @@ def main():
             st.info("No holdings found")
         else:
             holdings_data = []
-            for sym, shares in snap['positions'].items():
-                ltp, chg_abs, chg_perc = port.price_provider.get_price_and_change(sym)
-                avg_cost = port.positions[sym].cost_basis
-                cur_val = shares * ltp
-                pnl = (ltp - avg_cost) * shares
-                net_chg_perc = (pnl / (avg_cost*shares) * 100) if avg_cost > 0 else 0
-                
+            for row in port.position_values():
                 holdings_data.append({
-                    "Instrument": sym,
-                    "Qty.": shares,
-                    "Avg. cost": avg_cost,
-                    "LTP": ltp,
-                    "Cur. val": cur_val,
-                    "P&L": pnl,
-                    "Net chg.": net_chg_perc,
-                    "Day chg.": chg_perc
+                    "Instrument": row.symbol,
+                    "Qty.": row.shares,
+                    "Avg. cost": row.cost_basis,
+                    "LTP": row.price,
+                    "Cur. val": row.market_value,
+                    "P&L": row.unrealized_pnl,
+                    "Net chg.": (row.unrealized_pnl / row.cost * 100) if row.cost > 0 else 0,
+                    "Day chg.": row.day_change_pct
                 })
                 
             df_holdings = pd.DataFrame(holdings_data)
@@ -618,7 +659,7 @@ def main():
         st.write(f"Generate an on-demand AI prediction for **{tv_symbol}** based on live news flow and momentum.")
         
         if st.button(f"Generate AI Suggestion for {tv_symbol}", type="primary", use_container_width=True):
-            with st.spinner(f"Gemini analyzing {tv_symbol}..."):
+            with st.spinner(f"Gathering news for {tv_symbol}..."):
                 # Fetch recent news context
                 news_data = fetch_live_news_sentiments([tv_symbol])
                 context_str = news_data.get(tv_symbol, "No recent news found. Analyzing purely on momentum.")
@@ -626,31 +667,16 @@ def main():
                 # Force Gemini to output a definitive directional move
                 ltp, _, _ = port.price_provider.get_price_and_change(tv_symbol)
                 prompt = f"The stock {tv_symbol} is currently trading at {ltp}. Recent news context: '{context_str}'. Synthesize this data and provide a strict recommendation. You MUST start your response with exactly one of these words: [BUY], [SELL], or [HOLD], followed by a 2-sentence explanation of why."
-                
-                try:
-                    from google import genai
-                    client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
-                    response = client.models.generate_content(
-                        model='gemini-2.5-flash',
-                        contents=prompt,
-                    )
-                    
-                    ans = response.text.strip()
-                    
-                    # Parse color formatting based on string start
-                    color = "#555"
-                    bg = "#f5f5f5"
-                    if ans.upper().startswith("[BUY]") or ans.upper().startswith("BUY"):
-                        color = "#4caf50"
-                        bg = "#e8f5e9"
-                    elif ans.upper().startswith("[SELL]") or ans.upper().startswith("SELL"):
-                        color = "#e53935"
-                        bg = "#ffebee"
-                        
-                    st.markdown(f'<div style="padding: 16px; border-radius: 4px; border-left: 4px solid {color}; background-color: {bg}; color: #333; font-weight: 500; font-size: 14px;">Next Move Suggestion:<br><br>{ans}</div>', unsafe_allow_html=True)
-                    
-                except Exception as e:
-                    st.error(f"AI API Error: {e}")
+            
+            suggestion_placeholder = st.empty()
+            try:
+                # The card recolors itself once the leading [BUY]/[SELL] has streamed in
+                render_stream(
+                    stream_reply(prompt, kind="next_move"),
+                    lambda text: suggestion_placeholder.markdown(next_move_card(text), unsafe_allow_html=True),
+                )
+            except Exception as e:
+                suggestion_placeholder.error(f"AI API Error: {e}")
                     
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -666,36 +692,67 @@ def main():
             st.write("Aggregates real-time news for watchlist and scores sentiment.")
             
             st.markdown('<div class="kite-card" style="background: #fff9e6; border-left: 4px solid #ffbc00;">', unsafe_allow_html=True)
-            auto_scan = st.checkbox("🤖 Enable Autonomous AI News Sentinel", value=False, help="When enabled alongside the 30s auto-refresh, the Agent will continuously scan live feeds in the background.")
+            auto_scan = st.checkbox("🤖 Enable Autonomous AI News Sentinel", value=False, help="Shows signals published by the background sentinel service (python -m sentinel); with auto-refresh on they update every 30s.")
             st.markdown('</div>', unsafe_allow_html=True)
             
-            if auto_scan or st.button("Fetch & Analyze Single Batch", type="primary", use_container_width=True):
-                import random
-                # Randomly sample 2 symbols to respect the Gemini API rate limits on auto-refresh loops
-                scan_symbols = random.sample(st.session_state.watched_symbols, min(2, len(st.session_state.watched_symbols)))
+            scan_ready = False
+            if auto_scan:
+                # The headless sentinel (python -m sentinel) scans on its own schedule; just read what it published
+                sentinel_status = sentinel_store.status()
+                last_cycle = sentinel_status.get("last_cycle")
+                if last_cycle is None or time.time() - last_cycle > 3 * sentinel_status.get("interval", SENTINEL_INTERVAL):
+                    st.caption("Sentinel service is not running. Start it from src/ with `python -m sentinel`.")
+                else:
+                    st.caption(f"Sentinel last scanned {time.time() - last_cycle:.0f}s ago: {', '.join(sentinel_status.get('scanned', []))}")
+                signals = sentinel_store.latest(limit=len(st.session_state.watched_symbols))
+                news_data = {sig["symbol"]: sig["content"] for sig in signals}
+                scan_results = {sig["symbol"]: {"score": sig["score"], "summary": sig["summary"]} for sig in signals}
+                # Each published signal moves this session's risk (and may auto-execute) only once
+                seen_signals = st.session_state.setdefault("seen_signals", set())
+                fresh_symbols = {sig["symbol"] for sig in signals if (sig["symbol"], sig["scanned_at"]) not in seen_signals}
+                seen_signals.update((sig["symbol"], sig["scanned_at"]) for sig in signals)
+                scan_ready = True
+            elif st.button("Fetch & Analyze Single Batch", type="primary", use_container_width=True):
+                # Scan as many symbols as the shared Gemini quota allows, most overdue (and held) first
+                if "scan_scheduler" not in st.session_state:
+                    st.session_state.scan_scheduler = ScanScheduler()
+                scheduler = st.session_state.scan_scheduler
+                dispatcher = get_dispatcher()
+                scan_symbols = scheduler.next_symbols(st.session_state.watched_symbols, held=port.positions, budget=dispatcher.budget(horizon=SCAN_TIMEOUT))
                 
                 with st.spinner(f"Agent actively scraping feeds for {', '.join(scan_symbols)}..."):
                     news_data = fetch_live_news_sentiments(scan_symbols)
-                    
-                    if not news_data:
-                        st.info("No fresh news available right now.")
-                    else:
-                        for symbol, content in news_data.items():
-                            if content and "Mock market news" not in content:
-                                # Score the news via live Gemini API
-                                result = analyze_text(content)
-                                score = result.get("score", 0.0)
-                                summary = result.get("summary", "")
-                                
-                                # Process the Portfolio Risk Engine adjustments
-                                st.session_state.portfolio.update_risk(score)
-                                
-                                # Determine coloring schema for UI badge
-                                badge_class = "sentiment-bullish" if score > 0.3 else "sentiment-bearish" if score < -0.3 else "sentiment-neutral"
-                                badge_text = "Bullish" if score > 0.3 else "Bearish" if score < -0.3 else "Neutral"
-                                
-                                # Render Professional Card output
-                                html = f"""<div class="news-card">
+                    live_news = {sym: content for sym, content in news_data.items() if content and "Mock market news" not in content}
+                    # Score the news via live Gemini API, concurrently within the rate limit
+                    scan_results = dispatcher.run(live_news, timeout=SCAN_TIMEOUT)
+                    # Symbols that missed the rate limit stay overdue and go first next cycle
+                    scheduler.mark_scanned([sym for sym in scan_symbols if sym not in live_news or sym in scan_results])
+                fresh_symbols = set(scan_results)
+                scan_ready = True
+
+            if scan_ready:
+                if not news_data:
+                    st.info("No fresh news available right now.")
+                else:
+                    scan_scores = {sym: scan_results[sym].get("score", 0.0) for sym in news_data if sym in scan_results}
+                    # Process the Portfolio Risk Engine adjustments, then size every order in one pass
+                    for sym, score in scan_scores.items():
+                        if sym in fresh_symbols:
+                            st.session_state.portfolio.update_risk(score)
+                    drafts = {o["symbol"]: o for o in st.session_state.portfolio.draft_orders(scan_scores)}
+
+                    for symbol, content in news_data.items():
+                        if symbol in scan_results:
+                            result = scan_results[symbol]
+                            score = result.get("score", 0.0)
+                            summary = result.get("summary", "")
+                            
+                            # Determine coloring schema for UI badge
+                            badge_class = "sentiment-bullish" if score > 0.3 else "sentiment-bearish" if score < -0.3 else "sentiment-neutral"
+                            badge_text = "Bullish" if score > 0.3 else "Bearish" if score < -0.3 else "Neutral"
+                            
+                            # Render Professional Card output
+                            html = f"""<div class="news-card">
     <div class="news-header">
         <span class="news-symbol">{symbol}</span>
         <span class="sentiment-badge {badge_class}">{badge_text} ({score:.2f})</span>
@@ -706,29 +763,29 @@ def main():
         <span style="color:#888;">Live Gemini Flash Execution</span>
     </div>
 </div>"""
-                                st.markdown(html, unsafe_allow_html=True)
-                                
-                                # Auto Execute logic
-                                order = st.session_state.portfolio.draft_order(symbol, score)
-                                price = st.session_state.portfolio.get_price(symbol)
-                                
-                                if order["action"] != "hold":
-                                    auto_exec = fully_autonomous and abs(score) >= 0.7
-                                    if auto_exec:
+                            st.markdown(html, unsafe_allow_html=True)
+                            
+                            # Auto Execute logic
+                            order = drafts[symbol]
+                            price = float(order["price"])
+                            
+                            if order["action"] != "hold":
+                                auto_exec = fully_autonomous and abs(score) >= 0.7 and symbol in fresh_symbols
+                                if auto_exec:
+                                    st.session_state.portfolio.apply_order(order, sentiment_score=score)
+                                    snap = st.session_state.portfolio.snapshot()
+                                    snap["timestamp"] = time.time()
+                                    snap["sentiment"] = score
+                                    st.session_state.history.append(snap)
+                                    st.success(f"🤖 AUTO-TRACK: {order['action'].upper()} {order['quantity']:.2f} {symbol}")
+                                else:
+                                    if st.button(f"Record {order['action'].upper()} {symbol} (LTP ₹{price:.2f})", key=f"ex_{symbol}_{time.time()}"):
                                         st.session_state.portfolio.apply_order(order, sentiment_score=score)
                                         snap = st.session_state.portfolio.snapshot()
                                         snap["timestamp"] = time.time()
                                         snap["sentiment"] = score
                                         st.session_state.history.append(snap)
-                                        st.success(f"🤖 AUTO-TRACK: {order['action'].upper()} {order['quantity']:.2f} {symbol}")
-                                    else:
-                                        if st.button(f"Record {order['action'].upper()} {symbol} (LTP ₹{price:.2f})", key=f"ex_{symbol}_{time.time()}"):
-                                            st.session_state.portfolio.apply_order(order, sentiment_score=score)
-                                            snap = st.session_state.portfolio.snapshot()
-                                            snap["timestamp"] = time.time()
-                                            snap["sentiment"] = score
-                                            st.session_state.history.append(snap)
-                                            st.success(f"Recorded {order['action']} on {symbol}")
+                                        st.success(f"Recorded {order['action']} on {symbol}")
 
             st.markdown('</div>', unsafe_allow_html=True)
 
@@ -736,12 +793,9 @@ def main():
             st.markdown('<div class="kite-card">', unsafe_allow_html=True)
             st.subheader("🐦 Social Media Sentiment Stream")
             st.write("Stream unstructured social data (X/Discord) directly into the LLM logic engine.")
-            # Read all social media lines and display them concurrently
-            try:
-                with open("data/social_media.txt", "r", encoding="utf-8") as f:
-                    social_feed = [line.strip() for line in f if line.strip()]
-            except FileNotFoundError:
-                social_feed = []
+            # Posts tailed from data/social_media.txt; scoring below only touches new ones
+            social_feed = social_tail.posts
+            aggregates = st.session_state.social_aggregates
             
             if not social_feed:
                 st.warning("No social media feed data found in data/social_media.txt")
@@ -751,40 +805,35 @@ def main():
                     
                 col_btn1, col_btn2 = st.columns([2,1])
                 with col_btn1:
-                    if st.button("Analyze & Group Entire Feed via Gemini", type="primary", use_container_width=True):
-                        with st.spinner("Aggregating sentiment streams..."):
-                            grouped_data = {}
+                    # Once grouped, posts that arrive later are folded in on each rerun
+                    if st.button("Analyze & Group Entire Feed via Gemini", type="primary", use_container_width=True) or st.session_state.grouped_social_feed is not None:
+                        new_posts = aggregates.pending(social_tail)
+                        with st.spinner("Aggregating sentiment streams...") if new_posts else contextlib.nullcontext():
+                            feed_results = analyze_texts(new_posts) if new_posts else []
+                            mention_index = symbol_index(st.session_state.watched_symbols)
                             
-                            for current_post in social_feed:
-                                result = analyze_text(current_post)
+                            for current_post, result in zip(new_posts, feed_results):
                                 score = result.get("score", 0.0)
                                 summary = result.get("summary", "")
                                 
-                                mentioned_symbols = []
-                                for symbol in st.session_state.watched_symbols:
-                                    ticker = symbol.split('.')[0]
-                                    if f"${ticker}" in current_post or ticker in current_post:
-                                        mentioned_symbols.append(symbol)
-                                
-                                if not mentioned_symbols:
-                                    mentioned_symbols = ["GENERAL MARKET"]
+                                mentioned_symbols = mention_index.mentions(current_post) or ["GENERAL MARKET"]
                                     
-                                for symbol in mentioned_symbols:
-                                    if symbol not in grouped_data:
-                                        grouped_data[symbol] = {'posts': [], 'total_score': 0.0, 'count': 0}
-                                    grouped_data[symbol]['posts'].append({'text': current_post, 'score': score, 'summary': summary})
-                                    grouped_data[symbol]['total_score'] += score
-                                    grouped_data[symbol]['count'] += 1
+                                aggregates.add(current_post, score, summary, mentioned_symbols)
                             
-                            st.session_state.grouped_social_feed = grouped_data
+                        if st.session_state.grouped_social_feed is None:
+                            st.session_state.grouped_social_feed = aggregates.groups
                             st.rerun()
+                        st.session_state.grouped_social_feed = aggregates.groups
                 with col_btn2:
                     if st.session_state.grouped_social_feed is not None:
                         if st.button("Reset Feed Data"):
                             st.session_state.grouped_social_feed = None
+                            aggregates.reset()
                             st.rerun()
 
                 if st.session_state.grouped_social_feed is not None:
+                    group_scores = {sym: data['total_score'] / data['count'] for sym, data in st.session_state.grouped_social_feed.items() if sym != "GENERAL MARKET"}
+                    drafts = {o["symbol"]: o for o in st.session_state.portfolio.draft_orders(group_scores)}
                     for symbol, data in st.session_state.grouped_social_feed.items():
                         avg_score = data['total_score'] / data['count']
                         st.session_state.portfolio.update_risk(avg_score)
@@ -798,8 +847,8 @@ def main():
                                 st.markdown("<hr style='margin:8px 0;'>", unsafe_allow_html=True)
                             
                             if symbol != "GENERAL MARKET":
-                                order = st.session_state.portfolio.draft_order(symbol, avg_score)
-                                price = st.session_state.portfolio.get_price(symbol)
+                                order = drafts[symbol]
+                                price = float(order["price"])
                                 
                                 if order["action"] != "hold":
                                     st.markdown(f"<strong style='color:{badge_color}'>Aggregated Draft: {order['action'].upper()} {order['quantity']:.2f} shares @ ₹{price:.2f}</strong>", unsafe_allow_html=True)
@@ -890,6 +939,8 @@ def main():
         st.subheader("💾 Data Export")
         st.write("Download your active tracking portfolio and cost basis data as a spreadsheet.")
         
+        # Flush any trades journaled since the last CSV snapshot before exporting
+        st.session_state.portfolio.compact()
         try:
             with open("data/holdings.csv", "rb") as file:
                 btn = st.download_button(
@@ -904,9 +955,38 @@ def main():
             st.download_button("Download Holdings CSV", data="", disabled=True)
             
         st.markdown('</div>', unsafe_allow_html=True)
+
+        # Timing spans, cache counters and LLM latency collected by the metrics module
+        with st.expander("🩺 Diagnostics"):
+            breakers = circuit_breaker.all_stats()
+            if breakers:
+                st.dataframe(pd.DataFrame([
+                    {"Upstream": b["name"], "State": b["state"].replace("_", "-"), "Consecutive failures": b["failures"],
+                     "Trips": b["trips"], "Short-circuited calls": b["short_circuits"],
+                     "Retry in (s)": round(b["retry_in"]), "Last error": b["last_error"] or ""}
+                    for b in breakers
+                ]), use_container_width=True, hide_index=True)
+            diag = metrics.snapshot()
+            if not diag["enabled"]:
+                st.info("Instrumentation is disabled (SENTIRA_METRICS=0).")
+            else:
+                if diag["histograms"]:
+                    st.dataframe(pd.DataFrame([
+                        {"Span": h["name"].removesuffix("_seconds"), "Labels": ", ".join(f"{k}={v}" for k, v in h["labels"].items()),
+                         "Count": h["count"], "Mean (ms)": h["mean"] * 1000, "p50 ≤ (ms)": h["p50"] * 1000, "p95 ≤ (ms)": h["p95"] * 1000}
+                        for h in diag["histograms"]
+                    ]), use_container_width=True, hide_index=True)
+                if diag["counters"]:
+                    st.dataframe(pd.DataFrame([
+                        {"Counter": c["name"], "Labels": ", ".join(f"{k}={v}" for k, v in c["labels"].items()), "Value": c["value"]}
+                        for c in diag["counters"]
+                    ]), use_container_width=True, hide_index=True)
+                st.caption(f"Quote cache: {port.price_provider.stats()} · Sentiment cache: {sentiment_cache_stats()}")
+                col_json, col_prom = st.columns(2)
+                col_json.download_button("Download metrics JSON", data=metrics.to_json(), file_name="metrics.json", mime="application/json")
+                col_prom.download_button("Download Prometheus text", data=metrics.prometheus_text(), file_name="metrics.prom", mime="text/plain")
     if auto_refresh:
-        time.sleep(30)
-        st.rerun()
+        schedule_refresh(30)
 
 if __name__ == "__main__":
     main()
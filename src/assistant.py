@@ -0,0 +1,82 @@
+"""Streaming Gemini replies for the AI Assistant and Next Move panels.
+
+Both panels share the lazily built client from sentiment_engine instead of
+constructing one per click, and stream the answer chunk by chunk so the
+user sees text at time-to-first-token rather than after the whole reply.
+
+``stream_reply`` yields text chunks; ``render_stream`` pushes the growing
+text to any callable (a Streamlit placeholder's ``markdown``). Neither
+touches Streamlit, so a fake client whose ``models.generate_content_stream``
+returns objects with a ``.text`` attribute is all a test needs. A client
+without ``generate_content_stream`` is asked through ``generate_content``
+and its whole reply comes back as a single chunk.
+"""
+import time
+from typing import Callable, Iterable, Iterator
+
+import circuit_breaker
+import metrics
+from sentiment_engine import MODEL_NAME, get_client
+
+CURSOR = "▌"
+RENDER_INTERVAL = 0.05  # seconds between placeholder redraws while streaming
+
+
+def stream_reply(prompt: str, client=None, kind: str = "chat") -> Iterator[str]:
+    """Yield the model's reply to ``prompt`` as it streams in.
+
+    Raises RuntimeError without a configured client or while the Gemini
+    circuit breaker is open; upstream errors propagate to the caller.
+    """
+    client = client or get_client()
+    if client is None:
+        raise RuntimeError("Gemini is not configured (install google-genai and set GEMINI_API_KEY).")
+    breaker = circuit_breaker.get("gemini")
+    if not breaker.allow():
+        raise RuntimeError(f"Gemini is unreachable; retrying in {breaker.stats()['retry_in']:.0f}s.")
+
+    started = time.perf_counter()
+    try:
+        if hasattr(client.models, "generate_content_stream"):
+            chunks = iter(client.models.generate_content_stream(model=MODEL_NAME, contents=prompt))
+        else:
+            # no streaming in this client: the whole reply is the only chunk
+            chunks = iter([client.models.generate_content(model=MODEL_NAME, contents=prompt)])
+        first = next(chunks, None)
+    except Exception as e:
+        breaker.record_failure(e)
+        raise
+    # the first chunk proves the upstream is answering
+    breaker.record_success()
+    metrics.observe("llm_first_token_seconds", time.perf_counter() - started, kind=kind)
+    try:
+        if first is not None and first.text:
+            yield first.text
+        for chunk in chunks:
+            if chunk.text:
+                yield chunk.text
+    except Exception as e:
+        # a stream cut off mid-reply counts against the upstream too
+        breaker.record_failure(e)
+        raise
+    finally:
+        metrics.observe("llm_stream_seconds", time.perf_counter() - started, kind=kind)
+
+
+def render_stream(chunks: Iterable[str], show: Callable[[str], None], cursor: str = CURSOR,
+                  interval: float = RENDER_INTERVAL) -> str:
+    """Call ``show`` with the accumulated text as chunks arrive and return the full text.
+
+    The first chunk is drawn immediately; later redraws are throttled to
+    one per ``interval``. The final call shows the text without the cursor.
+    """
+    text = ""
+    last_draw = None
+    for chunk in chunks:
+        text += chunk
+        now = time.monotonic()
+        if last_draw is None or now - last_draw >= interval:
+            show(text + cursor)
+            last_draw = now
+    show(text)
+    return text
@@ -0,0 +1,201 @@
+"""Event-driven backtesting of the sentiment risk/ordering logic.
+
+Timestamped sentiment scores and OHLC bars are merged into one event stream
+and replayed through an in-memory ``Portfolio`` (``persist=False``), so the
+exact ``update_risk`` EMA and order sizing used live is what gets measured.
+Nothing is written to disk and no live prices are requested: orders fill at
+the latest close seen, and a bar counts as known at its own timestamp.
+
+Input files are CSVs with the columns
+
+* bars:      timestamp, symbol, open, high, low, close
+* sentiment: timestamp, symbol, score
+
+Usage: python backtest.py sentiment.csv bars.csv
+"""
+import argparse
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from portfolio import Portfolio
+
+BAR_COLUMNS = ["timestamp", "symbol", "open", "high", "low", "close"]
+SENTIMENT_COLUMNS = ["timestamp", "symbol", "score"]
+
+
+def load_bars(path: str) -> pd.DataFrame:
+    df = pd.read_csv(path, usecols=BAR_COLUMNS, dtype={"symbol": str})
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    return df
+
+
+def load_sentiment(path: str) -> pd.DataFrame:
+    df = pd.read_csv(path, usecols=SENTIMENT_COLUMNS, dtype={"symbol": str, "score": float})
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    return df
+
+
+class BarPrices:
+    """Price provider that serves the latest replayed close for each symbol."""
+
+    def __init__(self):
+        self.close: Dict[str, float] = {}
+        self._listeners: List[Callable] = []
+
+    def subscribe(self, callback: Callable[[str, float, float, float], None]):
+        self._listeners.append(callback)
+
+    def update(self, symbol: str, close: float):
+        self.close[symbol] = close
+        for callback in self._listeners:
+            callback(symbol, close, 0.0, 0.0)
+
+    def get_price(self, symbol: str) -> float:
+        return self.close.get(symbol, 0.0)
+
+    def get_many(self, symbols: List[str]) -> Dict[str, Tuple[float, float, float]]:
+        return {s: (self.close.get(s, 0.0), 0.0, 0.0) for s in symbols}
+
+
+@dataclass
+class BacktestResult:
+    equity: pd.Series  # portfolio value after each event timestamp
+    traded_value: float
+    trades: int
+    portfolio: Portfolio
+
+    @property
+    def drawdown(self) -> pd.Series:
+        """Fractional distance below the running equity peak (<= 0)."""
+        return self.equity / self.equity.cummax() - 1.0
+
+    @property
+    def max_drawdown(self) -> float:
+        return float(self.drawdown.min()) if len(self.equity) else 0.0
+
+    @property
+    def total_return(self) -> float:
+        if len(self.equity) == 0:
+            return 0.0
+        return float(self.equity.iloc[-1] / self.equity.iloc[0] - 1.0)
+
+    @property
+    def turnover(self) -> float:
+        """Traded value relative to average equity."""
+        mean = float(self.equity.mean()) if len(self.equity) else 0.0
+        return float(self.traded_value) / mean if mean > 0 else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "start_value": float(self.equity.iloc[0]) if len(self.equity) else 0.0,
+            "final_value": float(self.equity.iloc[-1]) if len(self.equity) else 0.0,
+            "total_return": self.total_return,
+            "max_drawdown": self.max_drawdown,
+            "turnover": self.turnover,
+            "trades": self.trades,
+        }
+
+
+@dataclass
+class EventStream:
+    """Bars and sentiment merged into time order as flat arrays.
+
+    Bars sort before sentiment at equal timestamps. ``values`` holds the close
+    for bars and the score for sentiment events; ``codes`` index ``symbols``.
+    Being plain arrays, a stream can be placed in shared memory (see sweep.py).
+    """
+    times: np.ndarray  # datetime64[ns]
+    is_signal: np.ndarray  # bool
+    codes: np.ndarray  # int32
+    values: np.ndarray  # float64
+    symbols: List[str]
+
+    @classmethod
+    def from_frames(cls, bars: pd.DataFrame, sentiment: pd.DataFrame) -> "EventStream":
+        times = np.concatenate([
+            bars["timestamp"].to_numpy(dtype="datetime64[ns]"),
+            sentiment["timestamp"].to_numpy(dtype="datetime64[ns]"),
+        ])
+        is_signal = np.concatenate([np.zeros(len(bars), bool), np.ones(len(sentiment), bool)])
+        codes, symbols = pd.factorize(np.concatenate([
+            bars["symbol"].to_numpy(dtype=object), sentiment["symbol"].to_numpy(dtype=object)
+        ]))
+        values = np.concatenate([bars["close"].to_numpy(dtype=float), sentiment["score"].to_numpy(dtype=float)])
+        order = np.lexsort((is_signal, times))
+        return cls(times[order], is_signal[order], codes[order].astype(np.int32), values[order], list(symbols))
+
+
+def replay(events: EventStream, **portfolio_kwargs) -> BacktestResult:
+    """Run one backtest over ``events``; ``portfolio_kwargs`` go to Portfolio
+    (cash, risk_level, ema_alpha, entry_threshold, liquidation_threshold, ...)."""
+    prices = BarPrices()
+    port = Portfolio(persist=False, **portfolio_kwargs)
+    port.price_provider = prices
+
+    times = events.times
+    is_signal = events.is_signal.tolist()
+    symbols = [events.symbols[c] for c in events.codes.tolist()]
+    values = events.values.tolist()
+
+    starts = np.flatnonzero(np.r_[True, times[1:] != times[:-1]]) if len(times) else np.array([], int)
+    ends = np.r_[starts[1:], len(times)]
+    equity = np.empty(len(starts))
+    traded_value = 0.0
+    trades = 0
+
+    for g, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+        scores: Dict[str, float] = {}
+        for i in range(start, end):
+            if is_signal[i]:
+                if symbols[i] in prices.close:  # no price yet, nothing to trade at
+                    port.update_risk(values[i])
+                    scores[symbols[i]] = values[i]
+            else:
+                prices.update(symbols[i], values[i])
+        if scores:
+            stamp = str(pd.Timestamp(times[start]).isoformat())
+            for o in port.draft_orders(scores):
+                if o["action"] == "hold":
+                    continue
+                before = len(port.trades)
+                port.apply_order(o, sentiment_score=scores[o["symbol"]], manual_price=o["price"], timestamp=stamp)
+                if len(port.trades) > before:
+                    trades += 1
+                    traded_value += float(o["quantity"] * o["price"])
+        equity[g] = port.total_value()
+
+    index = pd.DatetimeIndex(times[starts]) if len(times) else pd.DatetimeIndex([])
+    return BacktestResult(pd.Series(equity, index=index, name="equity"), traded_value, trades, port)
+
+
+class BacktestEngine:
+    def __init__(self, bars: pd.DataFrame, sentiment: pd.DataFrame, **portfolio_kwargs):
+        """``portfolio_kwargs`` are passed to Portfolio (see replay)."""
+        self.events = EventStream.from_frames(bars, sentiment)
+        self.portfolio_kwargs = portfolio_kwargs
+
+    def run(self) -> BacktestResult:
+        return replay(self.events, **self.portfolio_kwargs)
+
+
+def run_backtest(sentiment_path: str, bars_path: str, **portfolio_kwargs) -> BacktestResult:
+    return BacktestEngine(load_bars(bars_path), load_sentiment(sentiment_path), **portfolio_kwargs).run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest sentiment-driven trading on local data.")
+    parser.add_argument("sentiment", help="CSV with timestamp,symbol,score")
+    parser.add_argument("bars", help="CSV with timestamp,symbol,open,high,low,close")
+    parser.add_argument("--cash", type=float, default=100000.0)
+    parser.add_argument("--ema-alpha", type=float, default=0.2)
+    parser.add_argument("--entry-threshold", type=float, default=0.3)
+    parser.add_argument("--liquidation-threshold", type=float, default=0.7)
+    args = parser.parse_args()
+
+    result = run_backtest(args.sentiment, args.bars, cash=args.cash, ema_alpha=args.ema_alpha,
+                          entry_threshold=args.entry_threshold, liquidation_threshold=args.liquidation_threshold)
+    for key, value in result.summary().items():
+        print(f"{key:>14}: {value:,.4f}" if isinstance(value, float) else f"{key:>14}: {value}")
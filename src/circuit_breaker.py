@@ -0,0 +1,149 @@
+"""Per-upstream circuit breakers.
+
+Each flaky dependency (yfinance quotes, the Gemini API) gets a breaker.
+After FAILURE_THRESHOLD consecutive failures it opens, and callers skip
+the upstream and go straight to their fallback (the cached quote, the
+keyword scorer) instead of waiting out a timeout on every call. Once the
+retry delay has passed, a single probe call is let through (half-open):
+success closes the breaker, failure re-opens it with the delay doubled,
+up to MAX_RETRY_DELAY.
+
+    breaker = circuit_breaker.get("gemini")
+    if not breaker.allow():
+        return fallback()
+    with breaker.guard():
+        response = call_upstream()
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+
+import metrics
+
+FAILURE_THRESHOLD = 3  # consecutive failures that open a breaker
+RETRY_DELAY = 30.0  # seconds an open breaker waits before its first probe
+MAX_RETRY_DELAY = 300.0  # cap on the delay as repeated probes fail
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD, retry_delay: float = RETRY_DELAY,
+                 max_retry_delay: float = MAX_RETRY_DELAY, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0  # consecutive
+        self.retry_delay = retry_delay
+        self.retry_at = 0.0
+        self.trips = 0
+        self.short_circuits = 0
+        self.last_error = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """True if the caller may try the upstream now.
+
+        While open this is a flag check; once the retry delay is up exactly
+        one caller gets True (the half-open probe) until it reports back.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.clock() >= self.retry_at:
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.short_circuits += 1
+        metrics.incr("circuit_short_circuit_total", breaker=self.name)
+        return False
+
+    def is_open(self) -> bool:
+        """True while calls are being short-circuited; a probe that is due counts as not open."""
+        with self._lock:
+            return (self.state == OPEN and self.clock() < self.retry_at) or (self.state == HALF_OPEN and self._probing)
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self.retry_delay = self.base_retry_delay
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self, error: Exception = None):
+        with self._lock:
+            self.failures += 1
+            self.last_error = repr(error) if error is not None else None
+            if self.state == HALF_OPEN:
+                # the probe failed: back off further before the next one
+                self._probing = False
+                self.retry_delay = min(self.retry_delay * 2, self.max_retry_delay)
+                self._open()
+            elif self.state == CLOSED and self.failures >= self.failure_threshold:
+                self._open()
+
+    @contextmanager
+    def guard(self):
+        """Record the block's outcome: an exception is a failure, anything else a success."""
+        try:
+            yield
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self.record_success()
+
+    def reset(self):
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self.retry_delay = self.base_retry_delay
+            self.state = CLOSED
+
+    def _open(self):
+        self.retry_at = self.clock() + self.retry_delay
+        self.trips += 1
+        self._transition(OPEN)
+
+    def _transition(self, state: str):
+        self.state = state
+        metrics.incr("circuit_transition_total", breaker=self.name, state=state)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self.state,
+                "failures": self.failures,
+                "trips": self.trips,
+                "short_circuits": self.short_circuits,
+                "retry_in": max(0.0, self.retry_at - self.clock()) if self.state == OPEN else 0.0,
+                "last_error": self.last_error,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get(name: str) -> CircuitBreaker:
+    """The process-wide breaker for an upstream, created on first use."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(name, CircuitBreaker(name))
+    return breaker
+
+
+def all_stats() -> List[Dict]:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [b.stats() for b in breakers]
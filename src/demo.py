@@ -53,9 +53,8 @@ def run_demo():
         
         # Generate orders for each symbol
         print(f"\nGenerated Orders (scaled by signal magnitude):")
-        for symbol in SYMBOLS:
-            order = port.draft_order(symbol, score)
-            price = port.get_price(symbol)
+        for order in port.draft_orders(dict.fromkeys(SYMBOLS, score)):
+            symbol, price = order["symbol"], order["price"]
             
             if order["action"] != "hold":
                 print(f"  - {order['action'].upper():4s} {order['quantity']:8.2f} shares of {symbol} @ ${price:.2f}")
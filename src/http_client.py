@@ -0,0 +1,90 @@
+"""Shared HTTP client for news, quote and search requests.
+
+All outbound HTTP goes through one pooled ``requests.Session`` so repeated
+calls to the same host reuse keep-alive connections instead of paying a
+fresh TCP/TLS handshake each time. Transient failures are retried with
+exponential backoff, and ``conditional_get`` remembers ETag/Last-Modified
+validators so an unchanged RSS feed costs a 304 rather than a full download.
+"""
+import threading
+from typing import TYPE_CHECKING, Dict, Tuple
+
+if TYPE_CHECKING:
+    import requests  # loaded with the session, so importing this module stays cheap
+
+DEFAULT_TIMEOUT = 5  # seconds
+POOL_SIZE = 16  # keep-alive connections kept per host
+MAX_VALIDATORS = 512  # URLs whose ETag/Last-Modified and body we remember
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+
+_session: "requests.Session" = None
+_session_lock = threading.Lock()
+
+# url -> (etag, last_modified, body)
+_validators: Dict[str, Tuple[str, str, bytes]] = {}
+_validators_lock = threading.Lock()
+
+
+def get_session() -> "requests.Session":
+    """Return the process-wide pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                retry = Retry(
+                    total=2,
+                    backoff_factor=0.3,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=("GET", "HEAD"),
+                )
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+                session = requests.Session()
+                session.headers["User-Agent"] = USER_AGENT
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def get(url: str, timeout: float = DEFAULT_TIMEOUT, **kwargs) -> "requests.Response":
+    """GET url over the shared session."""
+    return get_session().get(url, timeout=timeout, **kwargs)
+
+
+def conditional_get(url: str, timeout: float = DEFAULT_TIMEOUT, **kwargs) -> Tuple[bytes, bool]:
+    """GET url with If-None-Match/If-Modified-Since from the previous response.
+
+    Returns ``(body, modified)``. On a 304 the body from the last full
+    response is returned with ``modified=False`` so callers can skip
+    re-parsing it.
+    """
+    with _validators_lock:
+        cached = _validators.get(url)
+    headers = dict(kwargs.pop("headers", None) or {})
+    if cached:
+        etag, last_modified, _ = cached
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+    resp = get(url, timeout=timeout, headers=headers, **kwargs)
+    if resp.status_code == 304 and cached:
+        return cached[2], False
+
+    if resp.status_code != 200:
+        # Error bodies are passed through (they fail to parse downstream) but never cached
+        return resp.content, True
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+    if etag or last_modified:
+        with _validators_lock:
+            _validators.pop(url, None)
+            _validators[url] = (etag, last_modified, resp.content)
+            while len(_validators) > MAX_VALIDATORS:
+                _validators.pop(next(iter(_validators)))
+    return resp.content, True
@@ -4,12 +4,17 @@ Attempts to fetch live content from the web; if any step fails, returns
 hardcoded mock data to guarantee that downstream components always receive
 some text.
 """
-from typing import List, Dict
-import requests
+from typing import List, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+import threading
 from bs4 import BeautifulSoup
 import feedparser
 import logging
 
+import http_client
+import metrics
+
 # Set up simple logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,10 +27,33 @@ MOCK_HEADLINES = [
     "Energy sector underperforms amid supply concerns.",
 ]
 
+RSS_URL = "https://feeds.finance.yahoo.com/rss/2.0/headline?s={sym}"
+QUOTE_PAGE_URL = "https://finance.yahoo.com/quote/{sym}"
+REQUEST_TIMEOUT = 5  # seconds per HTTP request
+FETCH_DEADLINE = 15.0  # seconds for a whole fetch() across all symbols
+PER_HOST_LIMIT = 6  # concurrent requests allowed against any single host, to stay polite to Yahoo
+# feeds and quote pages are on two hosts, so more workers would only queue for host slots
+MAX_WORKERS = 2 * PER_HOST_LIMIT
+
+# feed url -> headlines parsed from its last full (200) response, reused on 304
+_parsed_feeds: Dict[str, List[str]] = {}
+
+# (host, limit) -> semaphore shared by every fetcher in the process, so concurrent
+# sessions and scans together stay within the per-host limit
+_host_slots: Dict[Tuple[str, int], threading.BoundedSemaphore] = {}
+_host_slots_lock = threading.Lock()
+
 
 class HybridNewsFetcher:
-    def __init__(self, symbols: List[str] = None):
+    def __init__(self, symbols: List[str] = None, max_workers: int = MAX_WORKERS,
+                 deadline: float = FETCH_DEADLINE, per_host_limit: int = PER_HOST_LIMIT,
+                 rss_url: str = RSS_URL, quote_page_url: str = QUOTE_PAGE_URL):
         self.symbols = symbols or []
+        self.max_workers = max_workers
+        self.deadline = deadline
+        self.per_host_limit = per_host_limit
+        self.rss_url = rss_url
+        self.quote_page_url = quote_page_url
 
     def fetch(self) -> Dict[str, str]:
         """Return a dict mapping each symbol to a block of text.
@@ -33,48 +61,93 @@ class HybridNewsFetcher:
         Live data is attempted first; on failure the method returns mock
         headlines concatenated together so that sentiment analysis always
         has material to work on.
+
+        Symbols are fetched concurrently, at most ``per_host_limit`` requests
+        at a time per host across every fetcher in the process. Any symbol
+        still outstanding when ``deadline`` expires gets the mock text, so a
+        scan takes about one request round per ``per_host_limit`` symbols and
+        never longer than the deadline.
         """
+        symbols = list(dict.fromkeys(self.symbols))
+        if not symbols:
+            return {}
+        with metrics.span("news_fetch"):
+            return self._fetch_all(symbols)
+
+    def _fetch_all(self, symbols: List[str]) -> Dict[str, str]:
+        pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(symbols)))
+        futures = {pool.submit(self._fetch_symbol, sym): sym for sym in symbols}
+        done, not_done = wait(futures, timeout=self.deadline)
+        # don't block on stragglers; their threads finish in the background
+        pool.shutdown(wait=False, cancel_futures=True)
+        
         aggregated = {}
-        for sym in self.symbols:
-            try:
-                # 1. Try Yahoo Finance RSS
-                url = f"https://feeds.finance.yahoo.com/rss/2.0/headline?s={sym}"
-                feed = feedparser.parse(url)
-                
+        for future, sym in futures.items():
+            text = future.result() if future in done else None
+            if future in not_done:
+                logger.warning(f"News fetch for {sym} missed the {self.deadline:.1f}s deadline")
+                metrics.incr("news_deadline_missed_total")
+            if not text:
+                # 3. Fallback to mock
+                logger.info(f"Using mock data for {sym}")
+                metrics.incr("news_source_total", source="mock")
+                text = " ".join(MOCK_HEADLINES)
+            aggregated[sym] = text
+            
+        return aggregated
+
+    def _fetch_symbol(self, sym: str) -> str:
+        """Fetch live text for one symbol, or return None if every source fails."""
+        try:
+            # 1. Try Yahoo Finance RSS
+            url = self.rss_url.format(sym=sym)
+            with self._host_slot(url):
+                body, modified = http_client.conditional_get(url, timeout=REQUEST_TIMEOUT)
+            
+            if not modified and url in _parsed_feeds:
+                # Feed unchanged since last poll (304), skip the re-parse
+                headlines = _parsed_feeds[url]
+            else:
+                feed = feedparser.parse(body)
                 headlines = []
                 if not feed.bozo and feed.entries:
                     # Successfully parsed RSS
                     for entry in feed.entries[:5]: # Get top 5 headlines
                         headlines.append(entry.title)
-                
-                if headlines:
-                    aggregated[sym] = " ".join(headlines)
-                    logger.info(f"Fetched RSS headlines for {sym}")
-                    continue
-                
-                # 2. Try scraping if RSS fails or is empty
-                url = f"https://finance.yahoo.com/quote/{sym}"
-                headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
-                resp = requests.get(url, headers=headers, timeout=5)
-                soup = BeautifulSoup(resp.text, "html.parser")
-                
-                # Yahoo finance page structure changes often, try to find h3 tags which often hold news
-                news_tags = soup.find_all('h3')
-                scraped_text = " ".join([tag.get_text() for tag in news_tags if tag.get_text()])
-                
-                if scraped_text:
-                     aggregated[sym] = scraped_text
-                     logger.info(f"Scraped headlines for {sym}")
-                     continue
-                     
-            except Exception as e:
-                logger.warning(f"Failed to fetch news for {sym}: {e}")
-
-            # 3. Fallback to mock
-            logger.info(f"Using mock data for {sym}")
-            aggregated[sym] = " ".join(MOCK_HEADLINES)
+                _parsed_feeds[url] = headlines
             
-        return aggregated
+            if headlines:
+                logger.info(f"Fetched RSS headlines for {sym}")
+                metrics.incr("news_source_total", source="rss" if modified else "rss_not_modified")
+                return " ".join(headlines)
+            
+            # 2. Try scraping if RSS fails or is empty
+            url = self.quote_page_url.format(sym=sym)
+            with self._host_slot(url):
+                resp = http_client.get(url, timeout=REQUEST_TIMEOUT)
+            soup = BeautifulSoup(resp.text, "html.parser")
+            
+            # Yahoo finance page structure changes often, try to find h3 tags which often hold news
+            news_tags = soup.find_all('h3')
+            scraped_text = " ".join([tag.get_text() for tag in news_tags if tag.get_text()])
+            
+            if scraped_text:
+                logger.info(f"Scraped headlines for {sym}")
+                metrics.incr("news_source_total", source="scrape")
+                return scraped_text
+                 
+        except Exception as e:
+            logger.warning(f"Failed to fetch news for {sym}: {e}")
+        
+        return None
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        """Return the process-wide semaphore bounding concurrent requests to url's host."""
+        key = (urlparse(url).netloc, self.per_host_limit)
+        with _host_slots_lock:
+            if key not in _host_slots:
+                _host_slots[key] = threading.BoundedSemaphore(self.per_host_limit)
+            return _host_slots[key]
 
 
 # convenience function
@@ -0,0 +1,211 @@
+"""Write-ahead trade journal backing Portfolio persistence.
+
+Every executed trade is one SQLite transaction in WAL mode: the trade row,
+the touched position and the new cash balance commit together, so the
+journal never holds a trade without its effect (or the reverse) even if the
+process dies mid-write, and the cost per trade does not grow with history.
+
+The CSV files under ``data/`` (holdings, account, activity log) are kept as
+periodic snapshots for export and backwards compatibility; the journal
+remembers which trades have already been appended to the activity log so a
+crash between snapshots is caught up on the next boot.
+"""
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_JOURNAL_PATH = "data/journal.db"
+BUSY_TIMEOUT = 30.0  # seconds a write waits on another connection, e.g. a first-boot migration
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    symbol TEXT NOT NULL,
+    action TEXT NOT NULL,
+    quantity REAL NOT NULL,
+    price REAL NOT NULL,
+    timestamp TEXT NOT NULL,
+    sentiment REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS positions (
+    symbol TEXT PRIMARY KEY,
+    shares REAL NOT NULL,
+    cost_basis REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS account (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+# (symbol, action, quantity, price, timestamp, sentiment)
+TradeRow = Tuple[str, str, float, float, str, float]
+
+
+class TradeJournal:
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # WAL + NORMAL keeps every commit atomic; only the last few may be lost on power failure
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def has_state(self) -> bool:
+        """True once an account balance has been recorded (i.e. not a fresh journal)."""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM account WHERE key = 'cash'").fetchone() is not None
+
+    def load_state(self) -> Tuple[float, float, Dict[str, Tuple[float, float]]]:
+        """Return (cash, risk_level, {symbol: (shares, cost_basis)})."""
+        with self._lock:
+            account = dict(self._conn.execute("SELECT key, value FROM account"))
+            positions = {
+                sym: (shares, cost)
+                for sym, shares, cost in self._conn.execute("SELECT symbol, shares, cost_basis FROM positions")
+            }
+        return account.get("cash", 100000.0), account.get("risk_level", 1.0), positions
+
+    def load_realized_pnl(self) -> float:
+        """Profit or loss booked by sales since the journal was started."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM account WHERE key = 'realized_pnl'").fetchone()
+        return row[0] if row else 0.0
+
+    def last_trade_id(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM trades").fetchone()[0]
+
+    def count_trades(self, upto: Optional[int] = None) -> int:
+        with self._lock:
+            if upto is None:
+                return self._conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM trades WHERE id <= ?", (upto,)).fetchone()[0]
+
+    def load_trades(self, upto: Optional[int] = None) -> List[TradeRow]:
+        """All trades oldest first, optionally only those with id <= upto."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT symbol, action, quantity, price, timestamp, sentiment FROM trades WHERE id <= ? ORDER BY id",
+                (upto if upto is not None else 2**63 - 1,),
+            ).fetchall()
+
+    def tail_trades(self, n: int, upto: Optional[int] = None) -> List[TradeRow]:
+        """The last n trades (id <= upto), oldest first, read via the primary key index."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT symbol, action, quantity, price, timestamp, sentiment FROM trades "
+                "WHERE id <= ? ORDER BY id DESC LIMIT ?",
+                (upto if upto is not None else 2**63 - 1, n),
+            ).fetchall()
+        rows.reverse()
+        return rows
+
+    def record_trade(self, trade: TradeRow, cash: float, risk_level: float,
+                     position: Optional[Tuple[float, float]], realized_pnl: Optional[float] = None):
+        """Atomically append a trade with its resulting cash and position.
+
+        ``position`` is the (shares, cost_basis) now held in the traded
+        symbol, or None if the trade closed it. ``realized_pnl``, if given,
+        is the running realized P&L including this trade.
+        """
+        symbol = trade[0]
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO trades (symbol, action, quantity, price, timestamp, sentiment) VALUES (?, ?, ?, ?, ?, ?)",
+                trade,
+            )
+            if position is None:
+                self._conn.execute("DELETE FROM positions WHERE symbol = ?", (symbol,))
+            else:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO positions (symbol, shares, cost_basis) VALUES (?, ?, ?)",
+                    (symbol,) + tuple(position),
+                )
+            self._set_account(cash, risk_level, realized_pnl)
+
+    def replace_state(self, cash: float, risk_level: float, positions: Dict[str, Tuple[float, float]],
+                      realized_pnl: Optional[float] = None):
+        """Overwrite the account and every position in one transaction."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM positions")
+            self._conn.executemany(
+                "INSERT INTO positions (symbol, shares, cost_basis) VALUES (?, ?, ?)",
+                [(sym, shares, cost) for sym, (shares, cost) in positions.items()],
+            )
+            self._set_account(cash, risk_level, realized_pnl)
+
+    def migrate(self, cash: float, risk_level: float, positions: Dict[str, Tuple[float, float]],
+                trades: Iterable[TradeRow]) -> bool:
+        """Seed a fresh journal with state and history (from the CSV files) in one transaction.
+
+        A crash part-way leaves the journal empty, so the next boot simply
+        migrates again. Returns False, changing nothing, if another session
+        or process initialised the journal first.
+        """
+        with self._lock, self._conn:
+            # take the write lock before checking, so two first boots cannot both migrate
+            self._conn.execute("BEGIN IMMEDIATE")
+            if self._conn.execute("SELECT 1 FROM account WHERE key = 'cash'").fetchone() is not None:
+                return False
+            self._conn.executemany(
+                "INSERT INTO positions (symbol, shares, cost_basis) VALUES (?, ?, ?)",
+                [(sym, shares, cost) for sym, (shares, cost) in positions.items()],
+            )
+            self._conn.executemany(
+                "INSERT INTO trades (symbol, action, quantity, price, timestamp, sentiment) VALUES (?, ?, ?, ?, ?, ?)",
+                trades,
+            )
+            self._set_account(cash, risk_level)
+            # the CSV activity log already holds every imported trade
+            self._mark_snapshotted()
+        return True
+
+    def has_unsnapshotted(self) -> bool:
+        """True if some trade is missing from the CSV activity log."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT EXISTS (SELECT 1 FROM trades WHERE id > ?)", (self._snapshot_mark(),)
+            ).fetchone()[0] == 1
+
+    def unsnapshotted_trades(self) -> Tuple[int, List[TradeRow]]:
+        """Return (last_id, trades) for trades not yet appended to the CSV activity log."""
+        with self._lock:
+            last = self._snapshot_mark()
+            rows = self._conn.execute(
+                "SELECT id, symbol, action, quantity, price, timestamp, sentiment FROM trades WHERE id > ? ORDER BY id",
+                (last,),
+            ).fetchall()
+        return (rows[-1][0] if rows else last), [row[1:] for row in rows]
+
+    def mark_snapshotted(self, upto: int):
+        """Record that trades up to id ``upto`` are in the CSV activity log."""
+        with self._lock, self._conn:
+            self._mark_snapshotted(upto)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _set_account(self, cash: float, risk_level: float, realized_pnl: Optional[float] = None):
+        values = [("cash", cash), ("risk_level", risk_level)]
+        if realized_pnl is not None:
+            values.append(("realized_pnl", realized_pnl))
+        self._conn.executemany("INSERT OR REPLACE INTO account (key, value) VALUES (?, ?)", values)
+
+    def _snapshot_mark(self) -> int:
+        row = self._conn.execute("SELECT value FROM account WHERE key = 'snapshot_trade_id'").fetchone()
+        return int(row[0]) if row else 0
+
+    def _mark_snapshotted(self, last: Optional[int] = None):
+        if last is None:
+            (last,) = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM trades").fetchone()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO account (key, value) VALUES ('snapshot_trade_id', ?)", (last,)
+        )
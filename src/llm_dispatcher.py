@@ -0,0 +1,169 @@
+"""Rate-limit-aware scheduling of LLM sentiment calls.
+
+Three pieces work together so the Live Sentinel can spend the whole Gemini
+quota instead of guessing at it:
+
+* ``TokenBucket`` enforces the allowed request rate (shared process-wide,
+  since the quota belongs to the API key, not the browser session).
+* ``ScanScheduler`` picks which symbols to scan next: the ones scanned
+  longest ago first, with held positions treated as more overdue.
+* ``LLMDispatcher`` scores the chosen texts on a bounded worker pool,
+  taking one token per uncached call (none without a configured client or
+  while the Gemini circuit breaker is open, since those calls fall back to
+  the keyword scorer without reaching the API).
+"""
+import heapq
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+import circuit_breaker
+from sentiment_engine import analyze_text, is_cached, llm_available
+
+GEMINI_RPM = int(os.environ.get("GEMINI_RPM", "10"))  # requests per minute allowed on the key
+MAX_WORKERS = 4
+HELD_PRIORITY_BOOST = 120  # seconds; held positions are treated as this much more overdue
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Block until a token is available; False if timeout expires first."""
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            self._sleep(wait)
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+def quota_bucket(limit: int, window: float) -> TokenBucket:
+    """Build a bucket that never exceeds ``limit`` calls in any rolling ``window``.
+
+    A bucket admits at most capacity + rate * window calls per window, so a
+    quarter of the quota is kept as burst and the rest is spread evenly.
+    """
+    capacity = max(1.0, limit / 4)
+    return TokenBucket(rate=max(limit - capacity, 1e-6) / window, capacity=capacity)
+
+
+class ScanScheduler:
+    """Deterministic round-robin over a watchlist, weighted towards held positions."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.last_scanned: Dict[str, float] = {}
+        self._clock = clock
+
+    def next_symbols(self, symbols: List[str], held: Iterable[str] = (), budget: int = 1) -> List[str]:
+        """Return up to ``budget`` symbols, most overdue first.
+
+        Never-scanned symbols come first in watchlist order, so every symbol
+        is covered within ceil(len(symbols) / budget) cycles.
+        """
+        held = set(held)
+        heap = []
+        for order, sym in enumerate(dict.fromkeys(symbols)):
+            last = self.last_scanned.get(sym, float("-inf"))
+            if sym in held:
+                last -= HELD_PRIORITY_BOOST
+            heap.append((last, order, sym))
+        return [sym for _, _, sym in heapq.nsmallest(max(0, budget), heap)]
+
+    def mark_scanned(self, symbols: Iterable[str], when: Optional[float] = None):
+        when = self._clock() if when is None else when
+        for sym in symbols:
+            self.last_scanned[sym] = when
+
+
+class LLMDispatcher:
+    def __init__(self, bucket: TokenBucket, analyze: Callable[[str], dict] = analyze_text,
+                 cached: Callable[[str], bool] = is_cached, max_workers: int = MAX_WORKERS,
+                 breaker: Optional[circuit_breaker.CircuitBreaker] = None,
+                 available: Callable[[], bool] = llm_available):
+        self.bucket = bucket
+        self.analyze = analyze
+        self.cached = cached
+        self.available = available
+        self.max_workers = max_workers
+        self.breaker = breaker
+
+    def budget(self, horizon: float = 0.0) -> int:
+        """How many uncached calls can start within ``horizon`` seconds."""
+        return max(1, int(self.bucket.available() + self.bucket.rate * horizon))
+
+    def run(self, texts: Dict[str, str], timeout: Optional[float] = None) -> Dict[str, dict]:
+        """Score {key: text} concurrently within the rate limit.
+
+        Keys whose call could not get a token before ``timeout`` are left
+        out of the result, so the caller can retry them next cycle.
+        """
+        if not texts:
+            return {}
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # without a client every call falls back to the keyword scorer, so none needs a token
+        llm = self.available()
+
+        def score(text: str) -> Optional[dict]:
+            if llm and not self.cached(text) and not (self.breaker is not None and self.breaker.is_open()):
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                if not self.bucket.acquire(timeout=remaining):
+                    return None
+            return self.analyze(text)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(texts))) as pool:
+            futures = {key: pool.submit(score, text) for key, text in texts.items()}
+        results = {key: f.result() for key, f in futures.items()}
+        return {key: r for key, r in results.items() if r is not None}
+
+
+_dispatcher: LLMDispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> LLMDispatcher:
+    """Return the process-wide dispatcher sharing one token bucket for the API key."""
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = LLMDispatcher(quota_bucket(GEMINI_RPM, 60.0), breaker=circuit_breaker.get("gemini"))
+    return _dispatcher
@@ -1,40 +1,267 @@
 """Live market data fetching and caching."""
-import requests
+import threading
 import time
-from typing import Dict, List
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
 from datetime import datetime
 
+import circuit_breaker
+import http_client
+import metrics
+from quote_store import QuoteStore
+
 # Using Alpha Vantage for free tier (requires API key, but we'll provide mock fallback)
 # For production, integrate with: IEX Cloud, Polygon.io, or similar
 
 ALPHA_VANTAGE_API_KEY = "demo"  # Replace with actual key
 CACHE_EXPIRY = 60  # seconds
+MAX_FETCH_WORKERS = 8  # upper bound on concurrent yfinance round-trips
+REFRESH_AHEAD = 45  # seconds; background refresher re-fetches quotes older than this
+REFRESHER_IDLE_TIMEOUT = 300  # seconds without reads before the refresher shuts itself down
 
 class PriceCache:
-    def __init__(self):
+    """Thread-safe quote cache; see get_shared_cache() for the process-wide instance.
+
+    If a QuoteStore is given, the last persisted quotes are loaded at
+    construction with their original timestamps (so they count as stale and
+    get revalidated), and every live quote is written through to disk.
+    """
+
+    def __init__(self, store: QuoteStore = None):
         self.cache: Dict[str, Dict] = {}
+        self.store = store
+        self.watched: Dict[str, float] = {}  # symbol -> last time a reader asked for it
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.fetches = 0  # upstream yfinance lookups, including background refreshes
+        self._lock = threading.Lock()
+        self._fetched = threading.Condition(self._lock)
+        self._in_flight: set = set()
+        self._refresher: threading.Thread = None
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._last_read = time.time()
+        self._listeners: list = []  # weak references to quote callbacks
+        if store is not None:
+            try:
+                persisted = store.load_quotes()
+            except Exception as e:
+                # e.g. the sentinel holds the write lock past the busy timeout; start cold instead
+                print(f"Failed to load persisted quotes: {e}")
+                persisted = {}
+            for symbol, (price_data, fetched_at) in persisted.items():
+                self._store(symbol, price_data, timestamp=fetched_at)
     
     def get_price_and_change(self, symbol: str):
         """Fetch current price, absolute change, and percent change for symbol."""
-        if symbol in self.cache:
+        if self._is_fresh(symbol):
             cached = self.cache[symbol]
-            if time.time() - cached["timestamp"] < CACHE_EXPIRY:
-                return cached["price"], cached["change"], cached["percent_change"]
+            with self._lock:
+                self.hits += 1
+            metrics.incr("price_cache_total", result="hit")
+            return cached["price"], cached["change"], cached["percent_change"]
+        return self.get_many([symbol])[symbol]
+
+    def get_many(self, symbols: List[str]) -> Dict[str, Tuple[float, float, float]]:
+        """Fetch (price, change, percent_change) for many symbols at once.
+
+        Every stale symbol is fetched concurrently on a bounded thread pool,
+        so a cold watchlist costs roughly one round-trip instead of one per
+        symbol. Fresh entries are served straight from the cache.
+
+        While the background refresher is running, stale entries are served
+        as-is (stale-while-revalidate) and handed to the refresher; only
+        symbols that have never been quoted block on the network.
+        """
+        symbols = list(dict.fromkeys(symbols))  # de-duplicate, keep order
+        stale = [s for s in symbols if not self._is_fresh(s)]
+        hits = len(symbols) - len(stale)
+        
+        if self.is_refreshing():
+            self._last_read = time.time()
+            self.watch(symbols)
+            if any(s in self.cache for s in stale):
+                self._wake_event.set()
+            stale_hits = sum(1 for s in stale if s in self.cache)
+            stale = [s for s in stale if s not in self.cache]
+        else:
+            stale_hits = 0
+        
+        with self._lock:
+            self.hits += hits
+            self.stale_hits += stale_hits
+            self.misses += len(stale)
+        metrics.incr("price_cache_total", hits, result="hit")
+        metrics.incr("price_cache_total", stale_hits, result="stale")
+        metrics.incr("price_cache_total", len(stale), result="miss")
         
-        # Try to fetch real price
-        price_data = self._fetch_real_price(symbol)
+        self._refresh(stale)
+        missing = [s for s in symbols if s not in self.cache]
+        if missing:
+            # another thread is mid-fetch on these never-quoted symbols; wait for it
+            # instead of hitting yfinance twice
+            with self._fetched:
+                self._fetched.wait_for(lambda: not self._in_flight.intersection(missing), timeout=10.0)
+            for s in missing:
+                if s not in self.cache:
+                    with self._lock:
+                        self.fetches += 1
+                    price_data = self._fetch_real_price(s)
+                    self._store(s, price_data)
+                    self._persist({s: price_data})
+        return {
+            s: (self.cache[s]["price"], self.cache[s]["change"], self.cache[s]["percent_change"])
+            for s in symbols
+        }
+
+    def get_age(self, symbol: str) -> float:
+        """Seconds since symbol was last quoted (inf if never)."""
+        cached = self.cache.get(symbol)
+        return time.time() - cached["timestamp"] if cached else float("inf")
+
+    def watch(self, symbols: List[str]):
+        """Add symbols to the set the background refresher keeps fresh.
+
+        Symbols nobody has watched for REFRESHER_IDLE_TIMEOUT drop out of
+        the refresh set again.
+        """
+        now = time.time()
+        with self._lock:
+            for s in symbols:
+                self.watched[s] = now
+
+    def subscribe(self, callback: Callable[[str, float, float, float], None]):
+        """Call ``callback(symbol, price, change, percent_change)`` on every new quote.
+
+        Bound methods are held weakly, so a subscriber (e.g. a session's
+        Portfolio) does not outlive its session just by listening here.
+        """
+        ref = weakref.WeakMethod(callback) if hasattr(callback, "__self__") else (lambda: callback)
+        with self._lock:
+            self._listeners.append(ref)
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters for the cache."""
+        with self._lock:
+            total = self.hits + self.stale_hits + self.misses
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "fetches": self.fetches,
+                "hit_rate": (self.hits + self.stale_hits) / total if total else 0.0,
+                "symbols": len(self.cache),
+            }
+
+    def start_background_refresh(self):
+        """Start the daemon refresher thread. Safe to call on every rerun."""
+        self._last_read = time.time()
+        # sessions rerun on their own threads; check-and-start must be atomic
+        with self._lock:
+            if self.is_refreshing():
+                return
+            self._stop_event.clear()
+            self._refresher = threading.Thread(target=self._refresh_loop, name="price-refresher", daemon=True)
+            self._refresher.start()
+
+    def stop_background_refresh(self, timeout: float = 5.0):
+        """Signal the refresher thread to exit and wait for it."""
+        self._stop_event.set()
+        self._wake_event.set()
+        with self._lock:
+            refresher, self._refresher = self._refresher, None
+        if refresher is not None:
+            refresher.join(timeout)
+
+    def is_refreshing(self) -> bool:
+        return self._refresher is not None and self._refresher.is_alive()
+
+    def _refresh_loop(self):
+        """Keep watched symbols fresh until stopped or abandoned.
+
+        The thread exits on its own once nobody has read from the cache for
+        REFRESHER_IDLE_TIMEOUT, so a closed browser session does not leave
+        it polling yfinance forever.
+        """
+        while not self._stop_event.is_set():
+            if time.time() - self._last_read > REFRESHER_IDLE_TIMEOUT:
+                break
+            with self._lock:
+                cutoff = time.time() - REFRESHER_IDLE_TIMEOUT
+                watched = [s for s, seen in self.watched.items() if seen >= cutoff]
+            due = [s for s in watched if self.get_age(s) >= REFRESH_AHEAD]
+            try:
+                self._refresh(due)
+            except Exception as e:
+                print(f"Background price refresh failed: {e}")
+            self._wake_event.wait(timeout=1.0)
+            self._wake_event.clear()
+
+    def _refresh(self, symbols: List[str]):
+        """Fetch symbols concurrently and store the results in the cache.
+
+        Symbols already being fetched by another thread are skipped.
+        """
+        with self._lock:
+            symbols = [s for s in symbols if s not in self._in_flight]
+            self._in_flight.update(symbols)
+            self.fetches += len(symbols)
+        if not symbols:
+            return
+        try:
+            if len(symbols) == 1:
+                fetched = [self._fetch_real_price(symbols[0])]
+            else:
+                workers = min(MAX_FETCH_WORKERS, len(symbols))
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    fetched = list(pool.map(self._fetch_real_price, symbols))
+            for symbol, price_data in zip(symbols, fetched):
+                if price_data["source"] == "circuit_open" and symbol in self.cache:
+                    continue  # upstream is down: keep serving the last quote, with its real age
+                self._store(symbol, price_data)
+            self._persist(dict(zip(symbols, fetched)))
+        finally:
+            with self._fetched:
+                self._in_flight.difference_update(symbols)
+                self._fetched.notify_all()
+
+    def _is_fresh(self, symbol: str) -> bool:
+        return self.get_age(symbol) < CACHE_EXPIRY
+
+    def _persist(self, fetched: Dict[str, Dict[str, float]]):
+        """Write live (non-mock) quotes through to the on-disk store."""
+        if self.store is None:
+            return
+        live = {s: d for s, d in fetched.items() if d.get("source") not in ("mock", "circuit_open")}
+        try:
+            self.store.put_quotes(live)
+        except Exception as e:
+            print(f"Failed to persist quotes: {e}")
+
+    def _store(self, symbol: str, price_data: Dict[str, float], timestamp: float = None):
+        """Derive change figures from raw price data and cache them."""
         price = price_data.get("price", 100.0)
         prev_close = price_data.get("prev_close", 100.0)
         
         change = price - prev_close
         percent_change = (change / prev_close * 100) if prev_close > 0 else 0.0
         
-        self.cache[symbol] = {
+        entry = {
             "price": price, 
             "change": change,
             "percent_change": percent_change,
-            "timestamp": time.time()
+            "timestamp": timestamp if timestamp is not None else time.time()
         }
+        with self._lock:
+            self.cache[symbol] = entry
+            listeners = [ref() for ref in self._listeners]
+            if None in listeners:
+                self._listeners = [ref for ref, cb in zip(self._listeners, listeners) if cb is not None]
+        for callback in listeners:
+            if callback is not None:
+                callback(symbol, price, change, percent_change)
         return price, change, percent_change
         
     def get_price(self, symbol: str) -> float:
@@ -43,29 +270,60 @@ class PriceCache:
         return price
     
     def _fetch_real_price(self, symbol: str) -> Dict[str, float]:
-        """Attempt to fetch price and previous close from yfinance."""
+        """Fetch one quote upstream, timing it and counting which source answered."""
+        with metrics.span("quote_fetch"):
+            result = self._fetch_quote(symbol)
+        metrics.incr("quote_source_total", source=result["source"])
+        return result
+
+    def _fetch_quote(self, symbol: str) -> Dict[str, float]:
+        """Attempt to fetch price and previous close from yfinance.
+
+        While the yfinance circuit breaker is open no request is made and
+        the mock quote comes back tagged ``circuit_open``.
+        """
         result = {
             "price": 100.0 + hash(symbol) % 50,
-            "prev_close": 100.0 + hash(symbol) % 50 # mock fallback
+            "prev_close": 100.0 + hash(symbol) % 50, # mock fallback
+            "source": "mock",
         }
+        breaker = circuit_breaker.get("yfinance")
+        if not breaker.allow():
+            result["source"] = "circuit_open"
+            return result
         try:
-            import yfinance as yf
-            ticker = yf.Ticker(symbol)
-            
-            # fast info has the most current reliable price without downloading large histories
-            price = ticker.fast_info.get("last_price")
-            prev_close = ticker.fast_info.get("previous_close")
+            # only the yfinance calls count towards the breaker; local store errors
+            # (e.g. a locked SQLite file) say nothing about the upstream
+            with breaker.guard():
+                import yfinance as yf
+                ticker = yf.Ticker(symbol)
+                
+                # fast info has the most current reliable price without downloading large histories
+                price = ticker.fast_info.get("last_price")
+                prev_close = ticker.fast_info.get("previous_close")
             
             if price and prev_close:
                 result["price"] = float(price)
                 result["prev_close"] = float(prev_close)
+                result["source"] = "yfinance"
                 return result
                 
-            # fallback to history if fast_info fails
-            hist = ticker.history(period="5d")
-            if len(hist) >= 2:
-                result["price"] = float(hist['Close'].iloc[-1])
-                result["prev_close"] = float(hist['Close'].iloc[-2])
+            # fallback to history if fast_info fails, reusing cached daily bars when fresh
+            bars = self.store.get_history(symbol) if self.store is not None else None
+            if bars is None:
+                with breaker.guard():
+                    hist = ticker.history(period="5d")
+                bars = [
+                    (str(idx.date()), float(row["Open"]), float(row["High"]), float(row["Low"]),
+                     float(row["Close"]), float(row["Volume"]))
+                    for idx, row in hist.iterrows()
+                ]
+                if self.store is not None and bars:
+                    self.store.put_history(symbol, bars)
+            if len(bars) >= 2:
+                result["price"] = bars[-1][4]
+                result["prev_close"] = bars[-2][4]
+                result["source"] = "history"
                 return result
                 
         except Exception as e:
@@ -73,6 +331,30 @@ class PriceCache:
         
         return result
 
+_shared_cache: PriceCache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_cache() -> PriceCache:
+    """Return the process-wide PriceCache shared by every Streamlit session.
+
+    Sessions run on separate threads of one process, so sharing a single
+    cache makes upstream traffic scale with distinct symbols rather than
+    with sessions x symbols.
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                try:
+                    store = QuoteStore()
+                except Exception as e:
+                    print(f"On-disk quote cache unavailable, continuing in memory only: {e}")
+                    store = None
+                _shared_cache = PriceCache(store=store)
+    return _shared_cache
+
+
 def fetch_live_news_sentiments(symbols: List[str]) -> Dict[str, str]:
     """Fetch financial news for given symbols using a free news API."""
     # hybrid behaviour: attempt live API, fall back to scraping, then mock
@@ -88,7 +370,7 @@ def fetch_market_overview() -> Dict:
     try:
         # Could integrate with Finnhub, Alpha Vantage, etc.
         url = "https://www.alphavantage.co/query?function=NEWS_SENTIMENT&apikey=demo"
-        resp = requests.get(url, timeout=5)
+        resp = http_client.get(url, timeout=5)
         return resp.json()
     except Exception:
         return {
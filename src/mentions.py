@@ -0,0 +1,74 @@
+"""Symbol mention extraction for social posts.
+
+Instead of testing every watched ticker against every post with substring
+checks (O(posts x symbols), and "ITC" matches inside "SWITCH"), the
+watchlist is compiled once into a hash map from ticker token to symbols.
+Each post is tokenized on word boundaries and every token is one dict
+lookup, so the cost depends on post length, not watchlist size.
+
+Matching rules:
+
+* ``$TCS`` cashtags match case-insensitively.
+* Bare words must match the ticker exactly (``TCS``, not ``tcs``), which
+  keeps short tickers like ``LT`` from matching ordinary words.
+* Exchange-suffixed forms (``TCS.NS``) match the same symbol.
+* Hyphenated words match as a whole first (``BAJAJ-AUTO``), else part by
+  part (``TCS-INFY`` mentions both).
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# $-prefix, a ticker body (letters, digits, & and -), then an optional exchange suffix
+_TOKEN = re.compile(r"(\$?)([A-Za-z0-9][A-Za-z0-9&\-]*)(?:\.([A-Za-z]{1,4})\b)?")
+
+
+def ticker_of(symbol: str) -> str:
+    """'RELIANCE.NS' -> 'RELIANCE'."""
+    return symbol.split('.')[0]
+
+
+class SymbolIndex:
+    def __init__(self, symbols: Sequence[str]):
+        self.symbols: Tuple[str, ...] = tuple(symbols)
+        self._exact: Dict[str, List[str]] = {}
+        self._cashtag: Dict[str, List[str]] = {}
+        for symbol in dict.fromkeys(self.symbols):
+            ticker = ticker_of(symbol)
+            for key in {ticker, symbol}:
+                self._exact.setdefault(key, []).append(symbol)
+                self._cashtag.setdefault(key.upper(), []).append(symbol)
+
+    def mentions(self, post: str) -> List[str]:
+        """Watched symbols mentioned in ``post``, in order of first mention."""
+        found: Dict[str, None] = {}
+        for cashtag, body, suffix in _TOKEN.findall(post):
+            candidates = [f"{body}.{suffix}", body] if suffix else [body]
+            if not self._lookup(found, candidates, cashtag) and "-" in body:
+                # "TCS-INFY pair trade": no BAJAJ-AUTO style ticker matched, try each part
+                for part in body.split("-"):
+                    if part:
+                        self._lookup(found, [part], cashtag)
+        return list(found)
+
+    def _lookup(self, found: Dict[str, None], candidates: List[str], cashtag: bool) -> bool:
+        """Add the symbols of the first matching candidate to found; True on a match."""
+        for token in candidates:
+            hits = self._cashtag.get(token.upper()) if cashtag else self._exact.get(token)
+            if hits:
+                found.update(dict.fromkeys(hits))
+                return True
+        return False
+
+    def mentions_many(self, posts: Iterable[str]) -> List[List[str]]:
+        return [self.mentions(post) for post in posts]
+
+
+@lru_cache(maxsize=8)
+def _cached_index(symbols: Tuple[str, ...]) -> SymbolIndex:
+    return SymbolIndex(symbols)
+
+
+def symbol_index(symbols: Iterable[str]) -> SymbolIndex:
+    """Index for a watchlist, rebuilt only when the watchlist changes."""
+    return _cached_index(tuple(symbols))
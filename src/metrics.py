@@ -0,0 +1,195 @@
+"""Lightweight in-process instrumentation.
+
+Counters, latency histograms and timing spans for the hot paths (quote
+fetches, news ingestion, LLM calls, CSV persistence), exported as JSON or
+Prometheus text. Set ``SENTIRA_METRICS=0`` to disable: every call then
+returns after a single flag check and ``span`` hands back a shared no-op
+context manager.
+
+    with metrics.span("quote_fetch"):
+        ...
+    metrics.incr("quote_source_total", source="mock")
+    metrics.observe("llm_request_seconds", elapsed)
+"""
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+ENABLED = os.environ.get("SENTIRA_METRICS", "1") != "0"
+# upper bounds in seconds; the last bucket is +Inf
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+_lock = threading.Lock()
+_counters: Dict[_Key, float] = {}
+_histograms: Dict[_Key, List] = {}  # key -> [bucket counts..., count, sum]
+_NOOP = nullcontext()
+
+
+def _key(name: str, labels: Dict[str, str]) -> _Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def incr(name: str, value: float = 1, **labels):
+    """Add ``value`` to a counter."""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name: str, seconds: float, **labels):
+    """Record one latency sample (seconds) into a histogram."""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    slot = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [0] * (len(LATENCY_BUCKETS) + 1) + [0, 0.0]
+        hist[slot] += 1
+        hist[-2] += 1
+        hist[-1] += seconds
+
+
+@contextmanager
+def _timed(name: str, labels: Dict[str, str]):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name + "_seconds", time.perf_counter() - start, **labels)
+
+
+def span(name: str, **labels):
+    """Time a block into the ``<name>_seconds`` histogram."""
+    if not ENABLED:
+        return _NOOP
+    return _timed(name, labels)
+
+
+def timed(name: str, **labels):
+    """Decorator form of span."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with _timed(name, labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def enable(on: bool = True):
+    global ENABLED
+    ENABLED = on
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def _quantile(hist: List, q: float) -> float:
+    """Upper bucket bound below which a fraction q of samples fall."""
+    count = hist[-2]
+    if count == 0:
+        return 0.0
+    target, seen = q * count, 0
+    for bound, n in zip(LATENCY_BUCKETS + (float("inf"),), hist[:-2]):
+        seen += n
+        if seen >= target:
+            return bound
+    return float("inf")
+
+
+def snapshot() -> Dict:
+    """JSON-friendly dump of every counter and histogram."""
+    with _lock:
+        counters = [{"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(_counters.items())]
+        histograms = [
+            {
+                "name": name,
+                "labels": dict(labels),
+                "count": hist[-2],
+                "sum": hist[-1],
+                "mean": hist[-1] / hist[-2] if hist[-2] else 0.0,
+                "p50": _quantile(hist, 0.5),
+                "p95": _quantile(hist, 0.95),
+                "buckets": dict(zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], hist[:-2])),
+            }
+            for (name, labels), hist in sorted(_histograms.items())
+        ]
+    return {"enabled": ENABLED, "counters": counters, "histograms": histograms}
+
+
+def to_json() -> str:
+    return json.dumps(snapshot(), indent=2)
+
+
+def _labels_text(labels: Dict[str, str], extra: Dict[str, str] = None) -> str:
+    merged = {**labels, **(extra or {})}
+    if not merged:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in merged.items()) + "}"
+
+
+def prometheus_text() -> str:
+    """Render every metric in the Prometheus text exposition format."""
+    snap = snapshot()
+    lines = []
+    for c in snap["counters"]:
+        lines.append(f"sentira_{c['name']}{_labels_text(c['labels'])} {c['value']}")
+    for h in snap["histograms"]:
+        cumulative = 0
+        for bound, n in h["buckets"].items():
+            cumulative += n
+            lines.append(f"sentira_{h['name']}_bucket{_labels_text(h['labels'], {'le': bound})} {cumulative}")
+        lines.append(f"sentira_{h['name']}_count{_labels_text(h['labels'])} {h['count']}")
+        lines.append(f"sentira_{h['name']}_sum{_labels_text(h['labels'])} {h['sum']}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/metrics.json"):
+            body, ctype = to_json(), "application/json"
+        elif self.path.startswith("/metrics"):
+            body, ctype = prometheus_text(), "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+_server: ThreadingHTTPServer = None
+
+
+def start_http_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve /metrics (Prometheus text) and /metrics.json from a daemon thread, once per process."""
+    global _server
+    with _lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    return _server
@@ -1,9 +1,27 @@
-import pandas as pd
+import numpy as np
+import csv
 import os
+import threading
+from collections.abc import Sequence
 from dataclasses import dataclass, field
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional
 from datetime import datetime
 
+import metrics
+from journal import TradeJournal
+from valuation import PositionValue, ValuationEngine
+
+if TYPE_CHECKING:
+    import pandas as pd  # imported where DataFrames are built, not on every boot
+
+SNAPSHOT_EVERY = 25  # trades between CSV snapshot compactions
+# Activity logs up to this size (~100k trades) migrate into the journal during boot;
+# bigger ones migrate on a background thread so the first page load is not held up
+MIGRATE_INLINE_BYTES = 8 * 1024 * 1024
+ACTIVITY_LOG_PATH = "data/activity_log.csv"
+ACTIVITY_LOG_COLUMNS = ["symbol", "action", "quantity", "price", "timestamp", "sentiment", "value"]
+# Rows of Portfolio.draft_orders; each row can be passed to apply_order as-is
+ORDER_DTYPE = np.dtype([("symbol", object), ("action", "U4"), ("quantity", "f8"), ("price", "f8")])
 
 
 @dataclass
@@ -27,6 +45,219 @@ class Trade:
             "value": self.quantity * self.price,
         }
 
+    def to_row(self):
+        """Tuple form used by the trade journal."""
+        return (self.symbol, self.action, self.quantity, self.price, self.timestamp, self.sentiment_score)
+
+
+class TradeLog(Sequence):
+    """Columnar, list-like trade history.
+
+    Trades live in NumPy arrays (one per field) with symbols and actions
+    interned to small integer codes, so a trade costs a few dozen bytes
+    instead of a Python object, and filters or DataFrame views never build
+    per-row objects. Indexing and iteration still yield Trade objects,
+    materialized on access.
+
+    History persisted before boot stays in the journal until something needs
+    it: ``len`` is a COUNT query and ``tail`` reads only the last rows, so a
+    session with a million-trade history boots without touching them.
+    """
+
+    _COLUMNS = (
+        ("symbol", np.int32),
+        ("action", np.int8),
+        ("quantity", np.float64),
+        ("price", np.float64),
+        ("timestamp", "datetime64[us]"),
+        ("sentiment", np.float64),
+    )
+
+    def __init__(self, rows: Optional[List[tuple]] = None, journal: TradeJournal = None, upto: int = 0):
+        self._symbols: List[str] = []
+        self._symbol_codes: Dict[str, int] = {}
+        self._actions: List[str] = []
+        self._action_codes: Dict[str, int] = {}
+        self._n = 0
+        self._cols = {name: np.empty(64, dtype=dtype) for name, dtype in self._COLUMNS}
+        # when journal is set, history up to id ``upto`` has not been loaded yet
+        self._journal = journal
+        self._upto = upto
+        self._persisted_count = journal.count_trades(upto) if journal is not None else 0
+        if rows:
+            self.extend(rows)
+
+    # -- construction -------------------------------------------------------
+
+    def append(self, trade: "Trade"):
+        # scalar path: live trading and backtests append one trade at a time
+        self._reserve(self._n + 1)
+        i = self._n
+        self._cols["symbol"][i] = self._intern_one(trade.symbol, self._symbols, self._symbol_codes)
+        self._cols["action"][i] = self._intern_one(trade.action, self._actions, self._action_codes)
+        self._cols["quantity"][i] = trade.quantity
+        self._cols["price"][i] = trade.price
+        self._cols["timestamp"][i] = self._parse_timestamps([trade.timestamp])[0]
+        self._cols["sentiment"][i] = trade.sentiment_score
+        self._n = i + 1
+
+    def extend(self, rows: List[tuple]):
+        """Append journal-style rows (symbol, action, quantity, price, timestamp, sentiment)."""
+        if rows:
+            self.extend_columns(*zip(*rows))
+
+    def extend_columns(self, symbols, actions, quantities, prices, timestamps, sentiments):
+        """Append trades given column-wise, e.g. straight from a DataFrame."""
+        n = len(symbols)
+        if n == 0:
+            return
+        self._reserve(self._n + n)
+        end = self._n + n
+        self._cols["symbol"][self._n:end] = self._intern(symbols, self._symbols, self._symbol_codes)
+        self._cols["action"][self._n:end] = self._intern(actions, self._actions, self._action_codes)
+        self._cols["quantity"][self._n:end] = quantities
+        self._cols["price"][self._n:end] = prices
+        self._cols["timestamp"][self._n:end] = self._parse_timestamps(timestamps)
+        self._cols["sentiment"][self._n:end] = sentiments
+        self._n = end
+
+    @staticmethod
+    def _intern(values, table: List[str], codes: Dict[str, int]) -> np.ndarray:
+        """Map strings to stable integer codes, adding unseen ones to ``table``."""
+        import pandas as pd
+        local, uniques = pd.factorize(pd.Series(values, dtype=object).fillna("").astype(str))
+        mapping = np.empty(len(uniques), dtype=np.int32)
+        for i, v in enumerate(uniques):
+            code = codes.get(v)
+            if code is None:
+                code = codes[v] = len(table)
+                table.append(v)
+            mapping[i] = code
+        return mapping[local]
+
+    @staticmethod
+    def _intern_one(value, table: List[str], codes: Dict[str, int]) -> int:
+        value = "" if value is None else str(value)
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(table)
+            table.append(value)
+        return code
+
+    @staticmethod
+    def _parse_timestamps(values) -> np.ndarray:
+        try:
+            # ISO strings as written by datetime.isoformat(); the fast path
+            return np.asarray(values, dtype="datetime64[us]")
+        except (ValueError, TypeError):
+            import pandas as pd
+            return pd.to_datetime(pd.Series(values, dtype=object), errors="coerce").to_numpy("datetime64[us]")
+
+    def _reserve(self, size: int):
+        capacity = len(self._cols["price"])
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name, col in self._cols.items():
+            grown = np.empty(capacity, dtype=col.dtype)
+            grown[:self._n] = col[:self._n]
+            self._cols[name] = grown
+
+    def _ensure_loaded(self):
+        if self._journal is None:
+            return
+        journal, self._journal = self._journal, None
+        appended = self.tail(self._n)
+        self._n = 0
+        self.extend(journal.load_trades(self._upto))
+        self.extend(appended)
+
+    # -- sequence protocol --------------------------------------------------
+
+    def __len__(self):
+        return self._persisted_count * (self._journal is not None) + self._n
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1 and stop == len(self) and self._journal is not None:
+                return [Trade(*row) for row in self.tail(stop - start)]
+            self._ensure_loaded()
+            return [Trade(*self._row(i)) for i in range(start, stop, step)]
+        if index < 0 and self._journal is not None and -index <= len(self):
+            return Trade(*self.tail(-index)[0])
+        self._ensure_loaded()
+        if index < 0:
+            index += self._n
+        if not 0 <= index < self._n:
+            raise IndexError("trade index out of range")
+        return Trade(*self._row(index))
+
+    def __iter__(self):
+        self._ensure_loaded()
+        return (Trade(*self._row(i)) for i in range(self._n))
+
+    def _row(self, i: int) -> tuple:
+        c = self._cols
+        ts = c["timestamp"][i]
+        return (
+            self._symbols[c["symbol"][i]],
+            self._actions[c["action"][i]],
+            float(c["quantity"][i]),
+            float(c["price"][i]),
+            "" if np.isnat(ts) else ts.item().isoformat(),
+            float(c["sentiment"][i]),
+        )
+
+    # -- columnar access ----------------------------------------------------
+
+    def tail(self, n: int) -> List[tuple]:
+        """Last n trades as journal rows, oldest first."""
+        if n <= 0:
+            return []
+        if self._journal is None or n <= self._n:
+            return [self._row(i) for i in range(max(0, self._n - n), self._n)]
+        return self._journal.tail_trades(n - self._n, self._upto) + self.tail(self._n)
+
+    def frame(self, symbol: str = None, start=None, end=None, limit: int = None) -> "pd.DataFrame":
+        """Return trades as a DataFrame, optionally filtered by symbol and [start, end) time range.
+
+        Without a symbol or time filter the columns are views of the backing
+        arrays; ``limit`` keeps only the most recent matches.
+        """
+        import pandas as pd
+        if self._journal is not None:
+            if symbol is None and start is None and end is None and limit is not None:
+                return TradeLog(self.tail(limit)).frame()
+            self._ensure_loaded()
+
+        cols = {name: col[:self._n] for name, col in self._cols.items()}
+        mask = None
+        if symbol is not None:
+            code = self._symbol_codes.get(symbol, -1)
+            mask = cols["symbol"] == code
+        if start is not None:
+            after = cols["timestamp"] >= np.datetime64(pd.Timestamp(start).to_datetime64(), "us")
+            mask = after if mask is None else mask & after
+        if end is not None:
+            before = cols["timestamp"] < np.datetime64(pd.Timestamp(end).to_datetime64(), "us")
+            mask = before if mask is None else mask & before
+        if mask is not None:
+            cols = {name: col[mask] for name, col in cols.items()}
+        if limit is not None:
+            cols = {name: col[max(0, len(col) - limit):] for name, col in cols.items()}
+
+        return pd.DataFrame({
+            "symbol": pd.Categorical.from_codes(cols["symbol"], categories=self._symbols),
+            "action": pd.Categorical.from_codes(cols["action"], categories=self._actions),
+            "quantity": cols["quantity"],
+            "price": cols["price"],
+            "timestamp": cols["timestamp"],
+            "sentiment": cols["sentiment"],
+            "value": cols["quantity"] * cols["price"],
+        }, copy=False)
+
 
 @dataclass
 class Position:
@@ -40,15 +271,124 @@ class Portfolio:
     cash: float = 100000.0
     positions: Dict[str, Position] = field(default_factory=dict)
     risk_level: float = 1.0  # 0.0 conservative, 1.0 aggressive
-    trades: List[Trade] = field(default_factory=list)  # execution history
-    price_provider = None  # optional live price provider
+    trades: TradeLog = field(default_factory=TradeLog)  # execution history
     ema_alpha: float = 0.2 # smoothing factor for risk updates
     raw_sentiment_ema: float = 0.0
+    entry_threshold: float = 0.3  # |score| above which draft_order buys (or trims a held position)
+    liquidation_threshold: float = 0.7  # score below -this sells the whole position
+    journal: TradeJournal = field(default=None, repr=False, compare=False)  # write-ahead persistence
+    valuation: ValuationEngine = field(default_factory=ValuationEngine, repr=False, compare=False)
+    persist: bool = field(default=True, repr=False, compare=False)  # False: no journal or CSV I/O (backtests)
 
     def __post_init__(self):
-        """Load persistent holdings and trades from disk on boot."""
-        self.load_from_csv()
-        self.load_trades_from_csv()
+        """Load persistent holdings and trades from disk on boot.
+
+        The trade journal is the source of truth. On first run it is seeded
+        from the legacy CSV files; afterwards those are only snapshots.
+        With ``persist=False`` nothing is read from or written to disk.
+        """
+        self._trades_since_snapshot = 0
+        self._migration = None
+        if self.persist:
+            self._boot_from_disk()
+        self._revalue_positions()
+
+    def _boot_from_disk(self):
+        if self.journal is None:
+            self.journal = TradeJournal()
+        if not self.journal.has_state():
+            self.load_from_csv()
+            state = (self.cash, self.risk_level, self._position_state())
+            log_size = os.path.getsize(ACTIVITY_LOG_PATH) if os.path.exists(ACTIVITY_LOG_PATH) else 0
+            if log_size <= MIGRATE_INLINE_BYTES:
+                self._migrate_from_csv(*state)
+                return
+            # history shows up once the import commits; writes wait for it (see finish_migration)
+            self._migration = threading.Thread(target=self._migrate_from_csv, args=state, name="journal-migration")
+            self._migration.start()
+            return
+        self.load_from_journal()
+        if self.journal.has_unsnapshotted():
+            # catch the activity log up on trades journaled after the last snapshot
+            self.compact(force=True)
+
+    def _migrate_from_csv(self, cash: float, risk_level: float, positions: Dict):
+        """One-off import of the CSV activity log into a fresh journal, as a single transaction."""
+        log = self._read_activity_log()
+        rows = []
+        if log is not None:
+            # straight from the parsed columns: no per-row objects, original timestamp strings kept
+            text = log[["symbol", "action", "timestamp"]].fillna("")
+            rows = zip(text["symbol"].tolist(), text["action"].tolist(), log["quantity"].tolist(),
+                       log["price"].tolist(), text["timestamp"].tolist(), log["sentiment"].tolist())
+        if not self.journal.migrate(cash, risk_level, positions, rows):
+            # another session migrated first; its journal is the source of truth
+            self.load_from_journal()
+            self._revalue_positions()
+            return
+        # history stays in the journal until something reads it, as on a warm boot
+        self.trades = TradeLog(journal=self.journal, upto=self.journal.last_trade_id())
+
+    @property
+    def migrating(self) -> bool:
+        """True while a large activity log is still being imported in the background."""
+        return self._migration is not None and self._migration.is_alive()
+
+    def finish_migration(self):
+        """Wait for a background CSV import to commit; trades and state writes go after it."""
+        if self._migration is not None:
+            self._migration.join()
+            self._migration = None
+
+    @property
+    def price_provider(self):
+        """Optional live price provider (e.g. a PriceCache)."""
+        return getattr(self, "_price_provider", None)
+
+    @price_provider.setter
+    def price_provider(self, provider):
+        self._price_provider = provider
+        if provider is not None and hasattr(provider, "subscribe"):
+            # quotes refreshed by the provider flow straight into the valuation
+            provider.subscribe(self._on_quote)
+        self._revalue_positions()
+
+    def _on_quote(self, symbol: str, price: float, change: float, percent_change: float):
+        self.valuation.update_quote(symbol, price, percent_change)
+
+    def _revalue_positions(self):
+        """Re-seed the valuation from every position with one bulk price lookup."""
+        symbols = list(self.positions)
+        if self.price_provider and hasattr(self.price_provider, "get_many"):
+            quotes = self.price_provider.get_many(symbols)
+        else:
+            quotes = {s: (self.get_price(s), 0.0, 0.0) for s in symbols}
+        for sym, pos in self.positions.items():
+            price, _, percent_change = quotes[sym]
+            self.valuation.set_position(sym, pos.shares, pos.cost_basis, price)
+            self.valuation.update_quote(sym, price, percent_change)
+
+    def _sync_position(self, symbol: str):
+        """Push one position's new size and cost into the valuation."""
+        pos = self.positions.get(symbol)
+        if pos is None:
+            self.valuation.set_position(symbol, 0.0, 0.0)
+            return
+        price = self.valuation.price_of(symbol)
+        self.valuation.set_position(
+            symbol, pos.shares, pos.cost_basis, price if price is not None else self.get_price(symbol)
+        )
+
+    def load_from_journal(self):
+        """Restore cash, risk, positions and trade history from the journal."""
+        self.cash, self.risk_level, positions = self.journal.load_state()
+        self.positions = {sym: Position(sym, shares, cost) for sym, (shares, cost) in positions.items()}
+        self.valuation.realized_pnl = self.journal.load_realized_pnl()
+        # history stays in the journal until something actually reads it
+        self.trades = TradeLog(journal=self.journal, upto=self.journal.last_trade_id())
+
+    def _position_state(self) -> Dict:
+        return {sym: (pos.shares, pos.cost_basis) for sym, pos in self.positions.items()}
 
     def load_from_csv(self):
         """Fetch existing holdings from the CSV to preserve historical setup."""
@@ -66,11 +406,9 @@ class Portfolio:
 
         if os.path.exists("data/holdings.csv"):
             try:
-                df = pd.read_csv("data/holdings.csv")
-                for _, row in df.iterrows():
-                    sym = str(row["Symbol"])
-                    shares = float(row["Shares"])
-                    cost = float(row["CostBasis"])
+                import pandas as pd
+                df = pd.read_csv("data/holdings.csv", dtype={"Symbol": str})
+                for sym, shares, cost in zip(df["Symbol"], df["Shares"].astype(float), df["CostBasis"].astype(float)):
                     if shares > 0:
                         self.positions[sym] = Position(sym, shares, cost)
                         # Only mechanically deduct if we are upgrading an old save file
@@ -79,23 +417,36 @@ class Portfolio:
             except Exception:
                 pass
 
-    def load_trades_from_csv(self):
-        """Fetch historical trades from the CSV to preserve the activity log."""
-        if os.path.exists("data/activity_log.csv"):
+    def load_trades_from_csv(self) -> Optional["pd.DataFrame"]:
+        """Fetch historical trades from the CSV to preserve the activity log.
+
+        Returns the parsed log, or None if there is none or it is unreadable.
+        """
+        df = self._read_activity_log()
+        if df is not None:
+            # Column-wise conversion; Trade objects are only built when a row is read
+            self.trades = TradeLog()
+            self.trades.extend_columns(
+                df["symbol"].tolist(), df["action"].tolist(), df["quantity"].to_numpy(),
+                df["price"].to_numpy(), df["timestamp"].to_numpy(), df["sentiment"].to_numpy(),
+            )
+        return df
+
+    @staticmethod
+    def _read_activity_log() -> Optional["pd.DataFrame"]:
+        if os.path.exists(ACTIVITY_LOG_PATH):
             try:
-                df = pd.read_csv("data/activity_log.csv")
-                for _, row in df.iterrows():
-                    trade = Trade(
-                        symbol=str(row["symbol"]),
-                        action=str(row["action"]),
-                        quantity=float(row["quantity"]),
-                        price=float(row["price"]),
-                        timestamp=str(row["timestamp"]),
-                        sentiment_score=float(row["sentiment"])
-                    )
-                    self.trades.append(trade)
+                import pandas as pd
+                return pd.read_csv(
+                    ACTIVITY_LOG_PATH,
+                    usecols=["symbol", "action", "quantity", "price", "timestamp", "sentiment"],
+                    # plain object columns: cheaper to parse and to hand to SQLite than pandas strings
+                    dtype={"symbol": object, "action": object, "timestamp": object,
+                           "quantity": float, "price": float, "sentiment": float},
+                )
             except Exception:
                 pass
+        return None
 
     def update_risk(self, sentiment_score: float):
         """Adjust the portfolio's risk level from sentiment using EMA.
@@ -121,7 +472,7 @@ class Portfolio:
         # (stronger signal = larger position relative to risk allowance)
         magnitude_scalar = min(1.0, abs(sentiment_score))
         
-        if sentiment_score > 0.3:
+        if sentiment_score > self.entry_threshold:
             # allocate a portion of allowable risk capital based on signal strength
             raw_target_spend = (self.cash * self.risk_level) * magnitude_scalar
             price = self.get_price(symbol)
@@ -137,10 +488,10 @@ class Portfolio:
                 order["action"] = "buy"
                 order["quantity"] = qty
         
-        elif sentiment_score < -0.3 and symbol in self.positions:
+        elif sentiment_score < -self.entry_threshold and symbol in self.positions:
             # sell a portion of the position based on signal strength, or all if very strong
             pos = self.positions[symbol]
-            if sentiment_score < -0.7:
+            if sentiment_score < -self.liquidation_threshold:
                  quantity_to_sell = pos.shares # Liquidate
             else:
                  quantity_to_sell = pos.shares * magnitude_scalar
@@ -149,6 +500,46 @@ class Portfolio:
             
         return order
 
+    def draft_orders(self, scores: Mapping[str, float]) -> np.ndarray:
+        """Draft orders for many symbols at once, with the sizing rules of draft_order.
+
+        Prices come from one bulk lookup and sizes from one vectorized pass.
+        Buys are funded in ``scores`` order from a single cash pool, so the
+        batch as a whole never spends more than the available cash; buy
+        quantities are rounded down to keep that guarantee. Returns an
+        ORDER_DTYPE array aligned with ``scores``.
+        """
+        symbols = list(scores)
+        n = len(symbols)
+        orders = np.zeros(n, dtype=ORDER_DTYPE)
+        if n == 0:
+            return orders
+        score = np.fromiter(scores.values(), dtype=float, count=n)
+        prices = self.get_prices(symbols)
+        price = np.fromiter((prices[s] for s in symbols), dtype=float, count=n)
+        shares = np.fromiter(
+            (self.positions[s].shares if s in self.positions else 0.0 for s in symbols), dtype=float, count=n
+        )
+        magnitude = np.minimum(1.0, np.abs(score))
+
+        spend = np.where((score > self.entry_threshold) & (price > 0), self.cash * self.risk_level * magnitude, 0.0)
+        # each buy gets at most what earlier buys in the batch left over
+        spent_before = np.cumsum(spend) - spend
+        spend = np.minimum(spend, np.maximum(self.cash - spent_before, 0.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            buy_qty = np.where(price > 0, np.floor(spend / price * 100) / 100, 0.0)
+
+        sell = (score < -self.entry_threshold) & (shares > 0)
+        sell_qty = np.where(score < -self.liquidation_threshold, shares, shares * magnitude)  # liquidate on very strong signals
+        buy = buy_qty > 0
+
+        orders["symbol"] = symbols
+        orders["price"] = price
+        orders["action"] = np.where(buy, "buy", np.where(sell, "sell", "hold"))
+        orders["quantity"] = np.where(buy, buy_qty, np.where(sell, sell_qty, 0.0))
+        return orders
+
+    @metrics.timed("csv_sync")
     def sync_to_csv(self):
         """Dumps current holdings to a CSV file and updates account state."""
         import json
@@ -158,81 +549,115 @@ class Portfolio:
         with open("data/account.json", "w") as f:
             json.dump({"cash": self.cash, "risk_level": self.risk_level}, f)
             
-        if not self.positions:
-            pd.DataFrame(columns=["Symbol", "Shares", "CostBasis", "TotalCost"]).to_csv("data/holdings.csv", index=False)
-            return
-            
-        data = []
-        for sym, pos in self.positions.items():
-            data.append({
-                "Symbol": sym,
-                "Shares": pos.shares,
-                "CostBasis": pos.cost_basis,
-                "TotalCost": pos.shares * pos.cost_basis
-            })
-            
-        pd.DataFrame(data).to_csv("data/holdings.csv", index=False)
+        with open("data/holdings.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Symbol", "Shares", "CostBasis", "TotalCost"])
+            writer.writerows(
+                (sym, pos.shares, pos.cost_basis, pos.shares * pos.cost_basis)
+                for sym, pos in self.positions.items()
+            )
 
     def log_trade_to_csv(self, trade: Trade):
         """Appends a single executed trade to the activity log CSV."""
+        self.log_trades_to_csv([trade.to_row()])
+
+    @metrics.timed("csv_append")
+    def log_trades_to_csv(self, rows: List[tuple]):
+        """Appends journal trade rows to the activity log CSV in one write."""
         os.makedirs("data", exist_ok=True)
-        file_path = "data/activity_log.csv"
-        
-        # Format the trade dict specifically for the CSV
-        trade_data = trade.to_dict()
-        df = pd.DataFrame([trade_data])
+        file_path = ACTIVITY_LOG_PATH
         
         # Append without headers if file exists, else write with headers
-        if os.path.exists(file_path):
-            df.to_csv(file_path, mode='a', header=False, index=False)
-        else:
-            df.to_csv(file_path, index=False)
+        write_header = not os.path.exists(file_path)
+        with open(file_path, "a", newline="") as f:
+            writer = csv.writer(f)
+            if write_header:
+                writer.writerow(ACTIVITY_LOG_COLUMNS)
+            writer.writerows(row + (row[2] * row[3],) for row in rows)
+
+    def record_trade(self, trade: Trade):
+        """Append a trade to history and journal it with its effect on cash and position.
+
+        This is O(1) per trade; the CSV snapshots are rewritten only every
+        SNAPSHOT_EVERY trades (see compact).
+        """
+        self.finish_migration()
+        self.trades.append(trade)
+        self._sync_position(trade.symbol)
+        if not self.persist:
+            return
+        pos = self.positions.get(trade.symbol)
+        self.journal.record_trade(
+            trade.to_row(), self.cash, self.risk_level, (pos.shares, pos.cost_basis) if pos else None,
+            realized_pnl=self.valuation.realized_pnl,
+        )
+        self._trades_since_snapshot += 1
+        if self._trades_since_snapshot >= SNAPSHOT_EVERY:
+            self.compact()
+
+    def compact(self, force: bool = False):
+        """Bring the CSV snapshots up to date with the journal.
+
+        Appends journaled trades missing from the activity log and rewrites
+        the holdings and account files. Does nothing when no trade has been
+        recorded since the last snapshot unless ``force`` is set.
+        """
+        if not self.persist or (not force and self._trades_since_snapshot == 0):
+            return
+        self.finish_migration()
+        last_id, pending = self.journal.unsnapshotted_trades()
+        if pending:
+            self.log_trades_to_csv(pending)
+            self.journal.mark_snapshotted(last_id)
+        self.sync_to_csv()
+        self._trades_since_snapshot = 0
 
-    def apply_order(self, order: Dict, sentiment_score: float = 0.0, manual_price: float = None):
-        """Execute an order and record the trade."""
+    def apply_order(self, order: Dict, sentiment_score: float = 0.0, manual_price: float = None,
+                    timestamp: str = None):
+        """Execute an order and record the trade (stamped now unless ``timestamp`` is given)."""
+        timestamp = timestamp or datetime.now().isoformat()
+        # ORDER_DTYPE rows hold NumPy scalars; plain floats keep them out of positions, JSON and the journal
+        symbol, quantity = str(order["symbol"]), float(order["quantity"])
         if order["action"] == "buy":
-            price = manual_price if manual_price is not None else self.get_price(order["symbol"])
-            cost = order["quantity"] * price
+            price = float(manual_price if manual_price is not None else self.get_price(symbol))
+            cost = quantity * price
             if cost <= self.cash:
                 self.cash -= cost
-                pos = self.positions.get(order["symbol"], Position(order["symbol"], 0, 0))
-                total_shares = pos.shares + order["quantity"]
+                pos = self.positions.get(symbol, Position(symbol, 0, 0))
+                total_shares = pos.shares + quantity
                 pos.cost_basis = ((pos.cost_basis * pos.shares) + cost) / total_shares
                 pos.shares = total_shares
-                self.positions[order["symbol"]] = pos
+                self.positions[symbol] = pos
                 # Record trade
                 trade = Trade(
-                    symbol=order["symbol"],
+                    symbol=symbol,
                     action="buy",
-                    quantity=order["quantity"],
+                    quantity=quantity,
                     price=price,
-                    timestamp=datetime.now().isoformat(),
-                    sentiment_score=sentiment_score
+                    timestamp=timestamp,
+                    sentiment_score=float(sentiment_score)
                 )
-                self.trades.append(trade)
-                self.log_trade_to_csv(trade)
-                self.sync_to_csv()
+                self.record_trade(trade)
         elif order["action"] == "sell":
-            if order["symbol"] in self.positions:
-                pos = self.positions[order["symbol"]]
-                price = manual_price if manual_price is not None else self.get_price(order["symbol"])
-                proceeds = order["quantity"] * price
+            if symbol in self.positions:
+                pos = self.positions[symbol]
+                price = float(manual_price if manual_price is not None else self.get_price(symbol))
+                proceeds = quantity * price
                 self.cash += proceeds
-                pos.shares -= order["quantity"]
+                self.valuation.realize(symbol, (price - pos.cost_basis) * quantity)
+                pos.shares -= quantity
                 if pos.shares <= 0:
-                    del self.positions[order["symbol"]]
+                    del self.positions[symbol]
                 # Record trade
                 trade = Trade(
-                    symbol=order["symbol"],
+                    symbol=symbol,
                     action="sell",
-                    quantity=order["quantity"],
+                    quantity=quantity,
                     price=price,
-                    timestamp=datetime.now().isoformat(),
-                    sentiment_score=sentiment_score
+                    timestamp=timestamp,
+                    sentiment_score=float(sentiment_score)
                 )
-                self.trades.append(trade)
-                self.log_trade_to_csv(trade)
-                self.sync_to_csv()
+                self.record_trade(trade)
 
     def manually_update_position(self, symbol: str, quantity: float, cost_basis: float):
         """Allow the user to explicitly define a holding's quantity and cost, bypassing trade simulation."""
@@ -251,7 +676,12 @@ class Portfolio:
             # Full liquidation, return old cost to cash pool
             self.cash += old_cost
             
-        self.sync_to_csv()
+        self._sync_position(symbol)
+        if self.persist:
+            self.finish_migration()
+            self.journal.replace_state(self.cash, self.risk_level, self._position_state(),
+                                       realized_pnl=self.valuation.realized_pnl)
+            self.compact(force=True)
             
     def set_base_risk_level(self, risk_level: float):
         """Manually override or set the global risk level."""
@@ -264,12 +694,19 @@ class Portfolio:
         # Fallback: mock price with symbol-based variation
         return 100.0 + hash(symbol) % 50
 
+    def get_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Fetch prices for many symbols, using the provider's bulk path if it has one."""
+        if self.price_provider and hasattr(self.price_provider, "get_many"):
+            return {s: quote[0] for s, quote in self.price_provider.get_many(symbols).items()}
+        return {s: self.get_price(s) for s in symbols}
+
     def total_value(self) -> float:
-        """Compute current portfolio value (cash + positions)."""
-        value = self.cash
-        for pos in self.positions.values():
-            value += pos.shares * self.get_price(pos.symbol)
-        return value
+        """Current portfolio value (cash + positions), read from the running valuation."""
+        return self.cash + self.valuation.market_value
+
+    def position_values(self) -> List[PositionValue]:
+        """Per-position price, market value, cost and P&L, without any price lookups."""
+        return self.valuation.rows()
 
     def snapshot(self) -> Dict:
         """Return a dict summarizing cash, positions, risk, and value."""
@@ -278,9 +715,14 @@ class Portfolio:
             "positions": {s: p.shares for s, p in self.positions.items()},
             "risk_level": self.risk_level,
             "total_value": self.total_value(),
+            **self.valuation.totals(),
             "trades_count": len(self.trades),
         }
 
+    def trade_frame(self, symbol: str = None, start=None, end=None, limit: int = None) -> "pd.DataFrame":
+        """Trade history as a DataFrame without building per-trade objects (see TradeLog.frame)."""
+        return self.trades.frame(symbol=symbol, start=start, end=end, limit=limit)
+
     def get_trades(self, limit: int = 10) -> List[Dict]:
         """Return the most recent trades."""
-        return [t.to_dict() for t in self.trades[-limit:]]
+        return [Trade(*row).to_dict() for row in self.trades.tail(limit)]
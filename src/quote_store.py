@@ -0,0 +1,137 @@
+"""On-disk cache for last quotes and daily OHLC history.
+
+Backed by a single SQLite file under ``data/`` so a restarted process can
+serve the last known quotes immediately instead of cold-starting against
+yfinance for every symbol. Entries carry the time they were fetched
+(for TTL checks) and the time they were last read (for LRU eviction once
+the store grows past its size cap).
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_DB_PATH = "data/market_cache.db"
+QUOTE_TTL = 24 * 60 * 60  # seconds; older quotes are not worth serving at startup
+HISTORY_TTL = 15 * 60  # seconds; the last daily bar moves intraday
+MAX_CACHED_SYMBOLS = 2000  # per table, least recently used rows are evicted past this
+BUSY_TIMEOUT = 5.0  # seconds a write waits while another process (the sentinel) holds the lock
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    symbol TEXT PRIMARY KEY,
+    price REAL NOT NULL,
+    prev_close REAL NOT NULL,
+    fetched_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS history_meta (
+    symbol TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS history (
+    symbol TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (symbol, date)
+);
+"""
+
+# (date, open, high, low, close, volume)
+Bar = Tuple[str, float, float, float, float, float]
+
+
+class QuoteStore:
+    def __init__(self, path: str = DEFAULT_DB_PATH, max_symbols: int = MAX_CACHED_SYMBOLS):
+        self.path = path
+        self.max_symbols = max_symbols
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # One connection shared across the quote refresher and session threads, serialized by _lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=BUSY_TIMEOUT)
+        with self._lock:
+            # the app and the sentinel service share the file; WAL lets readers run beside a writer
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def load_quotes(self, max_age: float = QUOTE_TTL) -> Dict[str, Tuple[Dict[str, float], float]]:
+        """Return {symbol: (price_data, fetched_at)} for quotes younger than max_age."""
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT symbol, price, prev_close, fetched_at FROM quotes WHERE fetched_at >= ?", (now - max_age,)
+            ).fetchall()
+            # reading counts as use, so eviction drops the least recently used quotes
+            self._conn.executemany("UPDATE quotes SET last_access = ? WHERE symbol = ?", [(now, row[0]) for row in rows])
+            self._conn.commit()
+        return {sym: ({"price": price, "prev_close": prev}, fetched) for sym, price, prev, fetched in rows}
+
+    def put_quotes(self, quotes: Dict[str, Dict[str, float]]):
+        """Persist a batch of {symbol: {"price", "prev_close"}} quotes."""
+        if not quotes:
+            return
+        now = time.time()
+        rows = [(sym, q["price"], q["prev_close"], now, now) for sym, q in quotes.items()]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO quotes (symbol, price, prev_close, fetched_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._evict("quotes")
+            self._conn.commit()
+
+    def get_history(self, symbol: str, max_age: float = HISTORY_TTL) -> Optional[List[Bar]]:
+        """Return cached daily bars for symbol, oldest first, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            meta = self._conn.execute(
+                "SELECT fetched_at FROM history_meta WHERE symbol = ?", (symbol,)
+            ).fetchone()
+            if meta is None or now - meta[0] > max_age:
+                return None
+            self._conn.execute("UPDATE history_meta SET last_access = ? WHERE symbol = ?", (now, symbol))
+            self._conn.commit()
+            return self._conn.execute(
+                "SELECT date, open, high, low, close, volume FROM history WHERE symbol = ? ORDER BY date",
+                (symbol,),
+            ).fetchall()
+
+    def put_history(self, symbol: str, bars: List[Bar]):
+        """Replace the cached daily bars for symbol."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM history WHERE symbol = ?", (symbol,))
+            self._conn.executemany(
+                "INSERT INTO history (symbol, date, open, high, low, close, volume) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(symbol,) + tuple(bar) for bar in bars],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO history_meta (symbol, fetched_at, last_access) VALUES (?, ?, ?)",
+                (symbol, now, now),
+            )
+            self._evict("history_meta")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self, table: str):
+        """Drop least recently used symbols once table exceeds max_symbols. Caller holds _lock."""
+        (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+        excess = count - self.max_symbols
+        if excess <= 0:
+            return
+        victims = [
+            row[0] for row in self._conn.execute(
+                f"SELECT symbol FROM {table} ORDER BY last_access LIMIT ?", (excess,)
+            )
+        ]
+        self._conn.executemany(f"DELETE FROM {table} WHERE symbol = ?", [(v,) for v in victims])
+        if table == "history_meta":
+            self._conn.executemany("DELETE FROM history WHERE symbol = ?", [(v,) for v in victims])
@@ -1,49 +1,158 @@
 """Sentiment analysis utilities for news and social media."""
 
-from bs4 import BeautifulSoup
-import requests
-from typing import List
+from typing import Iterable, List
+
+import numpy as np
 
 # In a real implementation, this would call an LLM (e.g. OpenAI) or a
 # sentiment-analysis library such as TextBlob, Vader, or transformers.
 # The stub below allows the rest of the system to be exercised without
 # network access.
 
+# Weighted keyword groups. A group counts once per text no matter how many of
+# its terms appear; only whole words count, so each inflected form is listed
+# ("sold" counts as "sell", "badge" and "buyback" count as nothing).
+LEXICON = [
+    (frozenset(("good", "excellent", "bullish")), 0.6),
+    (frozenset(("buy", "buys", "buying", "buyer", "buyers")), 0.3),
+    (frozenset(("sell", "sells", "selling", "sold", "seller", "sellers",
+                "bad", "badly", "bearish")), -0.6),
+]
+# A term is negated when one of these is one or two words before it ("not good", "never really bullish")
+NEGATORS = frozenset(("not", "no", "never", "hardly", "without", "isn't", "aren't", "wasn't", "don't", "doesn't", "didn't", "won't"))
+
+_GROUP_WEIGHTS = np.array([weight for _, weight in LEXICON])
+_NEGATOR = len(LEXICON)  # token codes: 0..len(LEXICON)-1 are lexicon groups
+_SEPARATOR_CODE = len(LEXICON) + 1
+_OTHER = -1
+
+# Joins texts for batch scoring; never part of a word, so it is its own token
+_SEPARATOR = "\x00"
+# Tokenizing is lowercase -> blank out punctuation -> split on whitespace,
+# which runs at C speed even over a 100k-headline blob
+_PUNCTUATION = str.maketrans({
+    c: " " for c in (chr(i) for i in range(128)) if not (c.isalnum() or c in "_'" or c == _SEPARATOR)
+})
+_PUNCTUATION.update({ord("\u2019"): "'", ord("\u2014"): " ", ord("\u2013"): " ", ord("\u201c"): " ", ord("\u201d"): " "})
+_MAX_VOCAB = 200_000
+
+
+def _tokenize(text: str) -> List[str]:
+    return text.lower().translate(_PUNCTUATION).split()
+
+
+class _Vocabulary(dict):
+    """token -> code, classifying each distinct token only the first time it is seen."""
+
+    def __missing__(self, token: str) -> int:
+        if len(self) >= _MAX_VOCAB:
+            self.clear()
+        code = self[token] = _classify(token)
+        return code
+
+
+_VOCAB = _Vocabulary()
+
+
+def _classify(token: str) -> int:
+    if token in NEGATORS:
+        return _NEGATOR
+    if token == _SEPARATOR:
+        return _SEPARATOR_CODE
+    for g, (terms, _) in enumerate(LEXICON):
+        if token in terms:
+            return g
+    return _OTHER
+
+
 def analyze_text_sentiment(text: str) -> float:
     """Analyze sentiment of given text and return a polarity score.
 
     The value is in the range [-1.0, 1.0], where negative indicates
     bearish/negative sentiment and positive indicates bullish/positive
-    sentiment.  For now the function uses a simple keyword heuristic; in
-    production it would query an LLM or sentiment model.
+    sentiment.  For now the function uses a weighted keyword lexicon with
+    simple negation handling; in production it would query an LLM or
+    sentiment model.
 
     Examples::
 
         >>> analyze_text_sentiment("This company is doing good business")
-        0.5
+        0.6
         >>> analyze_text_sentiment("Time to sell; the outlook is weak")
-        -0.2
+        -0.6
+        >>> analyze_text_sentiment("The outlook is not good")
+        -0.6
+        >>> analyze_text_sentiment("Goodbye to the bestseller's badge")
+        0.0
     """
+    found = [False] * len(LEXICON)
+    negated = [False] * len(LEXICON)
+    codes = [_VOCAB[t] for t in _tokenize(text)]
+    for i, code in enumerate(codes):
+        if 0 <= code < _NEGATOR:
+            if (i >= 1 and codes[i - 1] == _NEGATOR) or (i >= 2 and codes[i - 2] == _NEGATOR):
+                negated[code] = True
+            else:
+                found[code] = True
     score = 0.0
-    txt = text.lower()
-    if any(word in txt for word in ["good", "excellent", "bullish"]):
-        score += 0.6
-    if "buy" in txt:
-        score += 0.3
-    if "sell" in txt or "bad" in txt or "bearish" in txt:
-        score -= 0.6
-    # clamp
+    for g, (_, weight) in enumerate(LEXICON):
+        # plain mentions win; a group seen only under negation flips sign
+        if found[g]:
+            score += weight
+        elif negated[g]:
+            score -= weight
     return max(-1.0, min(1.0, score))
 
 
+def score_texts(texts: Iterable[str]):
+    """Score many texts in one vectorized pass.
+
+    All texts are tokenized in one pass over their concatenation, each
+    distinct token is classified once, and negation and
+    per-text aggregation are done with NumPy array ops. Returns an array of
+    scores aligned with ``texts`` (a pandas Series with the same index when
+    given a Series), identical to calling analyze_text_sentiment on each.
+    """
+    index = texts.index if hasattr(texts, "to_numpy") else None
+    texts = ["" if t is None else str(t) for t in texts]
+    n = len(texts)
+
+    tokens = _tokenize(f" {_SEPARATOR} ".join(texts))
+    codes = np.fromiter(map(_VOCAB.__getitem__, tokens), dtype=np.int8, count=len(tokens))
+    docs = np.cumsum(codes == _SEPARATOR_CODE)
+
+    is_neg = codes == _NEGATOR
+    neg_before = np.zeros(len(codes), dtype=bool)
+    neg_before[1:] |= is_neg[:-1]
+    # two back only counts if the word in between is in the same text
+    neg_before[2:] |= is_neg[:-2] & (codes[1:-1] != _SEPARATOR_CODE)
+
+    is_term = (codes >= 0) & (codes < _NEGATOR)
+    plain = is_term & ~neg_before
+    negged = is_term & neg_before
+    found = np.zeros((n, len(LEXICON)), dtype=bool)
+    negated = np.zeros((n, len(LEXICON)), dtype=bool)
+    found[docs[plain], codes[plain]] = True
+    negated[docs[negged], codes[negged]] = True
+
+    contrib = np.where(found, _GROUP_WEIGHTS, np.where(negated, -_GROUP_WEIGHTS, 0.0))
+    scores = np.clip(contrib.sum(axis=1), -1.0, 1.0)
+    if index is not None:
+        import pandas as pd
+        return pd.Series(scores, index=index)
+    return scores
+
+
 def fetch_mock_news(url: str) -> str:
     """Scrape mock news text from a URL.
 
     This helper simply retrieves the page and strips tags.  It is used by
     the demo to produce input for the sentiment analyzer.
     """
+    import http_client
+    from bs4 import BeautifulSoup
     try:
-        resp = requests.get(url, timeout=5)
+        resp = http_client.get(url, timeout=5)
         soup = BeautifulSoup(resp.text, "html.parser")
         return soup.get_text()
     except Exception:
@@ -54,5 +163,4 @@ def aggregate_sentiments(texts: List[str]) -> float:
     """Combine multiple sentiment scores into a single average score."""
     if not texts:
         return 0.0
-    scores = [analyze_text_sentiment(t) for t in texts]
-    return sum(scores) / len(scores)
+    return float(score_texts(texts).mean())
@@ -0,0 +1,167 @@
+"""Content-addressed memoization for LLM sentiment results.
+
+Scores are keyed by a hash of the whitespace-normalized text together with
+a model/prompt version string, so a byte-identical headline (or one that
+only differs in spacing) is scored once and then served from memory. An
+optional SQLite tier keeps results across restarts. Entries expire after a
+TTL so a changed model or prompt never serves stale judgements forever;
+expired rows are also deleted from disk, which is capped at a row limit.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_MAX_DISK_ENTRIES = 100_000  # rows kept in the SQLite tier
+DEFAULT_TTL = 24 * 60 * 60  # seconds
+PRUNE_EVERY = 500  # disk writes between sweeps of expired and excess rows
+
+
+def normalize_text(text: str) -> str:
+    """Collapse runs of whitespace so trivially reformatted text shares a key."""
+    return " ".join(text.split())
+
+
+class SentimentCache:
+    def __init__(self, version: str, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl: float = DEFAULT_TTL, db_path: Optional[str] = None,
+                 max_disk_entries: int = DEFAULT_MAX_DISK_ENTRIES):
+        self.version = version
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (stored_at, result)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._puts_since_prune = 0
+
+    def key(self, text: str) -> str:
+        payload = f"{self.version}\0{normalize_text(text)}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, text: str) -> Optional[Dict]:
+        """Return a copy of the cached result for text, or None."""
+        key = self.key(text)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry[1])
+            if entry is not None:
+                del self._entries[key]
+
+            row = self._disk_get(key, now)
+            if row is not None:
+                self._remember(key, row)
+                self.disk_hits += 1
+                return dict(row[1])
+
+            self.misses += 1
+            return None
+
+    def contains(self, text: str) -> bool:
+        """True if text has an unexpired entry in either tier. Does not touch stats."""
+        key = self.key(text)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                return True
+            return self._disk_get(key, now) is not None
+
+    def put(self, text: str, result: Dict):
+        key = self.key(text)
+        entry = (time.time(), dict(result))
+        with self._lock:
+            self._remember(key, entry)
+            self._disk_put(key, entry)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db() is not None:
+                self._conn.execute("DELETE FROM sentiment")
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / total if total else 0.0,
+                "entries": len(self._entries),
+            }
+
+    def _remember(self, key: str, entry: tuple):
+        """Insert into the in-memory LRU tier. Caller holds _lock."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        """Open the SQLite tier on first use. Caller holds _lock."""
+        if self.db_path is None:
+            return None
+        if self._conn is None:
+            try:
+                if os.path.dirname(self.db_path):
+                    os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+                self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS sentiment (key TEXT PRIMARY KEY, stored_at REAL NOT NULL, result TEXT NOT NULL)"
+                )
+                self._conn.execute("CREATE INDEX IF NOT EXISTS sentiment_stored_at ON sentiment (stored_at)")
+                self._prune()
+            except sqlite3.Error as e:
+                print(f"Sentiment cache DB unavailable, using memory only: {e}")
+                self.db_path = None
+                return None
+        return self._conn
+
+    def _disk_get(self, key: str, now: float) -> Optional[tuple]:
+        conn = self._db()
+        if conn is None:
+            return None
+        row = conn.execute("SELECT stored_at, result FROM sentiment WHERE key = ?", (key,)).fetchone()
+        if row is None or now - row[0] >= self.ttl:
+            return None
+        return row[0], json.loads(row[1])
+
+    def _disk_put(self, key: str, entry: tuple):
+        conn = self._db()
+        if conn is None:
+            return
+        conn.execute(
+            "INSERT OR REPLACE INTO sentiment (key, stored_at, result) VALUES (?, ?, ?)",
+            (key, entry[0], json.dumps(entry[1])),
+        )
+        self._puts_since_prune += 1
+        if self._puts_since_prune >= PRUNE_EVERY:
+            self._prune()
+        conn.commit()
+
+    def _prune(self):
+        """Delete expired rows, then the oldest ones beyond max_disk_entries. Caller holds _lock."""
+        self._conn.execute("DELETE FROM sentiment WHERE stored_at < ?", (time.time() - self.ttl,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM sentiment").fetchone()
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM sentiment WHERE key IN (SELECT key FROM sentiment ORDER BY stored_at LIMIT ?)", (excess,)
+            )
+        self._conn.commit()
+        self._puts_since_prune = 0
@@ -8,19 +8,24 @@ non-JSON, a keyword heuristic fallback is used.
 """
 import os
 import json
+import hashlib
+import threading
+import time
+from typing import List
 
+import circuit_breaker
+import metrics
 from sentiment import analyze_text_sentiment
+from sentiment_cache import SentimentCache
 
-try:
-    from google import genai
-    from google.genai import types
-    from dotenv import load_dotenv
-    load_dotenv()
-    
-    api_key = os.environ.get("GEMINI_API_KEY")
-    client = genai.Client(api_key=api_key) if api_key else None
-except ImportError:
-    genai = None
+# The Gemini SDK, .env and client are loaded on first use (see get_client)
+genai = None
+types = None
+client = None
+_client_loaded = False
+_client_lock = threading.Lock()
+
+MODEL_NAME = 'gemini-2.5-flash'
 
 PROMPT_TEMPLATE = (
     "You are a financial sentiment analyzer.\n"
@@ -33,29 +38,98 @@ PROMPT_TEMPLATE = (
     '"""{text}"""\n'
 )
 
+BATCH_PROMPT_TEMPLATE = (
+    "You are a financial sentiment analyzer.\n"
+    "You will be given a JSON array of items, each with an integer 'index' and a 'text'.\n"
+    "Respond with a JSON array ONLY, no text explanation, containing exactly one object per item with keys:\n"
+    "  - index: the index of the item being scored\n"
+    "  - score: a number between -1.0 (very negative) and 1.0 (very positive)\n"
+    "  - summary: a single-sentence summary of the sentiment.\n"
+    "Do not include any other keys or comments.\n"
+    "Items:\n"
+    "{items}\n"
+)
+
+# Rough packing budget for one batch request (about 4 characters per token)
+MAX_BATCH_ITEMS = 40
+MAX_BATCH_TOKENS = 6000
 
-def analyze_with_llm(text: str) -> dict:
-    """Analyze text using the Gemini 1.5 Flash engine.
+# Cached scores are only valid for the model and prompts that produced them
+PROMPT_VERSION = hashlib.sha256((PROMPT_TEMPLATE + BATCH_PROMPT_TEMPLATE).encode("utf-8")).hexdigest()[:12]
 
-    Returns a dict with keys 'score' (float) and 'summary' (str). Falls
-    back to a simple heuristic if the API call fails for any reason.
+# Set SENTIMENT_CACHE_DB to an empty string to keep the cache in memory only
+_cache = SentimentCache(
+    version=f"{MODEL_NAME}:{PROMPT_VERSION}",
+    db_path=os.environ.get("SENTIMENT_CACHE_DB", "data/sentiment_cache.db") or None,
+)
+
+
+def get_client():
+    """Return the shared Gemini client, creating it on first call.
+
+    Importing google-genai and reading .env cost more than the rest of the
+    engine put together, so importing this module does neither. Returns
+    None when the SDK is missing or no GEMINI_API_KEY is set.
     """
+    global genai, types, client, _client_loaded
+    if not _client_loaded:
+        with _client_lock:
+            if not _client_loaded:
+                try:
+                    from google import genai as sdk
+                    from google.genai import types as sdk_types
+                    from dotenv import load_dotenv
+                except ImportError:
+                    pass
+                else:
+                    load_dotenv()
+                    genai, types = sdk, sdk_types
+                    api_key = os.environ.get("GEMINI_API_KEY")
+                    if client is None and api_key:
+                        client = genai.Client(api_key=api_key)
+                _client_loaded = True
+    return client
+
+
+def llm_available() -> bool:
+    """True if a Gemini client is configured, i.e. uncached calls reach the API."""
+    return get_client() is not None
+
+
+def _fallback(text: str, reason: str) -> dict:
+    return {
+        "score": analyze_text_sentiment(text),
+        "summary": reason + text.strip().replace("\n", " ")[:100] + "...",
+    }
+
+
+def _analyze(text: str):
+    """Score text, returning (result, from_llm). Only LLM results are worth caching."""
+    client = get_client()
     if client is None:
-        return {
-            "score": analyze_text_sentiment(text),
-            "summary": "API SDK missing. " + text.strip().replace("\n", " ")[:100] + "...",
-        }
+        metrics.incr("sentiment_fallback_total", reason="sdk_missing")
+        return _fallback(text, "API SDK missing. "), False
+    breaker = circuit_breaker.get("gemini")
+    if not breaker.allow():
+        # Gemini is failing: answer from the keyword scorer without waiting on it
+        metrics.incr("sentiment_fallback_total", reason="circuit_open")
+        return _fallback(text, "LLM unavailable. "), False
 
     prompt = PROMPT_TEMPLATE.format(text=text)
     
     try:
-        response = client.models.generate_content(
-            model='gemini-2.5-flash',
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json",
-            ),
-        )
+        started = time.perf_counter()
+        try:
+            with breaker.guard():
+                response = client.models.generate_content(
+                    model=MODEL_NAME,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        response_mime_type="application/json",
+                    ),
+                )
+        finally:
+            metrics.observe("llm_request_seconds", time.perf_counter() - started, kind="single")
         
         output = response.text.strip()
         result = json.loads(output)
@@ -64,23 +138,139 @@ def analyze_with_llm(text: str) -> dict:
         if "score" in result:
             result["score"] = max(-1.0, min(1.0, float(result["score"])))
             
-        return result
+        return result, True
         
     except Exception as e:
         print(f"API Error traceback: {e}")
+        metrics.incr("sentiment_fallback_total", reason="llm_error")
         # Fallback to mathematical sentiment heuristic if LLM throws error
-        return {
-            "score": analyze_text_sentiment(text),
-            "summary": f"LLM parsing failed. {text.strip().replace(chr(10), ' ')[:100]}...",
-        }
+        return _fallback(text, "LLM parsing failed. "), False
+
+
+def analyze_with_llm(text: str) -> dict:
+    """Analyze text using the Gemini 2.5 Flash engine.
+
+    Returns a dict with keys 'score' (float) and 'summary' (str). Falls
+    back to a simple heuristic if the API call fails for any reason.
+    """
+    return _analyze(text)[0]
 
 
 def analyze_text(text: str) -> dict:
     """Public API: always return a dict with score and summary.
 
-    This is the function other modules should call.
+    This is the function other modules should call. Results are memoized
+    by content hash, so repeat headlines cost no LLM call.
     """
     # ensure text is not empty
     if not text or not text.strip():
         text = "No content available. Market data could not be retrieved."
-    return analyze_with_llm(text)
+    cached = _cache.get(text)
+    metrics.incr("sentiment_cache_total", result="miss" if cached is None else "hit")
+    if cached is not None:
+        return cached
+    result, from_llm = _analyze(text)
+    if from_llm:
+        _cache.put(text, result)
+    return result
+
+
+def analyze_texts(texts: List[str]) -> List[dict]:
+    """Batch version of analyze_text: one result dict per input, in order.
+
+    Uncached texts are de-duplicated and packed into as few JSON-array
+    prompts as the batch budget allows. Any item the model omits or scores
+    invalidly is retried on its own through analyze_text.
+    """
+    texts = [t if t and t.strip() else "No content available. Market data could not be retrieved." for t in texts]
+    results: List[dict] = [None] * len(texts)
+    
+    pending = {}  # cache key -> indexes of texts sharing it
+    for i, text in enumerate(texts):
+        cached = _cache.get(text)
+        metrics.incr("sentiment_cache_total", result="miss" if cached is None else "hit")
+        if cached is not None:
+            results[i] = cached
+        else:
+            pending.setdefault(_cache.key(text), []).append(i)
+    
+    if get_client() is not None:
+        unique = [idxs[0] for idxs in pending.values()]
+        for batch in _pack_batches([texts[i] for i in unique]):
+            scored = _score_batch([texts[unique[j]] for j in batch])
+            for j, result in zip(batch, scored):
+                if result is None:
+                    continue
+                text = texts[unique[j]]
+                _cache.put(text, result)
+                for i in pending[_cache.key(text)]:
+                    results[i] = dict(result)
+    
+    for i, result in enumerate(results):
+        if result is None:
+            results[i] = analyze_text(texts[i])
+    return results
+
+
+def _pack_batches(texts: List[str]) -> List[List[int]]:
+    """Group text indexes into batches that fit MAX_BATCH_ITEMS and MAX_BATCH_TOKENS."""
+    batches, current, tokens = [], [], 0
+    for i, text in enumerate(texts):
+        cost = len(text) // 4 + 16  # per-item JSON overhead
+        if current and (len(current) >= MAX_BATCH_ITEMS or tokens + cost > MAX_BATCH_TOKENS):
+            batches.append(current)
+            current, tokens = [], 0
+        current.append(i)
+        tokens += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _score_batch(texts: List[str]) -> List[dict]:
+    """Score texts in one LLM request. Items that fail validation come back as None."""
+    breaker = circuit_breaker.get("gemini")
+    if not breaker.allow():
+        # analyze_texts retries each item through analyze_text, which falls back too
+        return [None] * len(texts)
+    items = json.dumps([{"index": i, "text": t} for i, t in enumerate(texts)], ensure_ascii=False)
+    try:
+        with metrics.span("llm_request", kind="batch"), breaker.guard():
+            response = get_client().models.generate_content(
+                model=MODEL_NAME,
+                contents=BATCH_PROMPT_TEMPLATE.format(items=items),
+                config=types.GenerateContentConfig(
+                    response_mime_type="application/json",
+                ),
+            )
+        parsed = json.loads(response.text.strip())
+    except Exception as e:
+        print(f"Batch API Error traceback: {e}")
+        metrics.incr("sentiment_fallback_total", reason="batch_error")
+        return [None] * len(texts)
+    
+    results = [None] * len(texts)
+    if not isinstance(parsed, list):
+        return results
+    for item in parsed:
+        try:
+            idx = int(item["index"])
+            score = max(-1.0, min(1.0, float(item["score"])))
+            summary = str(item["summary"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 0 <= idx < len(texts):
+            results[idx] = {"score": score, "summary": summary}
+    return results
+
+
+def is_cached(text: str) -> bool:
+    """True if analyze_text would answer text from the cache without an LLM call."""
+    if not text or not text.strip():
+        text = "No content available. Market data could not be retrieved."
+    return _cache.contains(text)
+
+
+def cache_stats() -> dict:
+    """Hit/miss statistics for the analyze_text memoization cache."""
+    return _cache.stats()
@@ -0,0 +1,218 @@
+"""Headless news sentinel, decoupled from Streamlit reruns.
+
+Runs the ingestion -> LLM scoring -> risk update -> order drafting loop on
+its own schedule and publishes every scored symbol to a small SQLite store.
+The Streamlit app only reads that store, so scan throughput depends on this
+process, not on how many browsers are open.
+
+Run from src/:
+
+    python -m sentinel [--interval 60] [--symbols TCS.NS,INFY.NS] [--once]
+
+Holdings are read (never written) from the trade journal each cycle so
+drafted orders reflect the current book; executing them stays a UI action.
+"""
+import argparse
+import json
+import os
+import signal
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from journal import DEFAULT_JOURNAL_PATH, TradeJournal
+import metrics
+from llm_dispatcher import LLMDispatcher, ScanScheduler, get_dispatcher
+from market_data import fetch_live_news_sentiments, get_shared_cache
+from portfolio import Portfolio, Position
+
+DEFAULT_SENTINEL_DB = "data/sentinel.db"
+SCAN_INTERVAL = 60  # seconds between scan cycles
+SCAN_TIMEOUT = 10  # seconds a cycle may wait on the Gemini rate limit
+CONTENT_CHARS = 1000  # news text kept per published signal
+DEFAULT_WATCHLIST = [
+    "RELIANCE.NS", "TCS.NS", "HDFCBANK.NS", "INFY.NS", "ICICIBANK.NS",
+    "SBIN.NS", "BHARTIARTL.NS", "ITC.NS", "HINDUNILVR.NS", "LT.NS",
+    "BAJFINANCE.NS", "KOTAKBANK.NS", "AXISBANK.NS", "ASIANPAINT.NS",
+    "MARUTI.NS", "SUNPHARMA.NS", "TITAN.NS", "ULTRACEMCO.NS",
+    "WIPRO.NS", "NESTLEIND.NS", "HCLTECH.NS", "ONGC.NS", "ADANIENT.NS",
+    "NTPC.NS", "POWERGRID.NS", "M&M.NS", "BAJAJFINSV.NS", "JSWSTEEL.NS",
+    "TATASTEEL.NS", "COALINDIA.NS", "BRITANNIA.NS", "HINDALCO.NS", "TECHM.NS",
+    "INDUSINDBK.NS", "EICHERMOT.NS", "DRREDDY.NS", "CIPLA.NS", "GRASIM.NS"
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    symbol TEXT PRIMARY KEY,
+    scanned_at REAL NOT NULL,
+    score REAL NOT NULL,
+    summary TEXT NOT NULL,
+    content TEXT NOT NULL,
+    action TEXT NOT NULL,
+    quantity REAL NOT NULL,
+    price REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS status (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+_SIGNAL_COLUMNS = ("symbol", "scanned_at", "score", "summary", "content", "action", "quantity", "price")
+
+
+class SentinelStore:
+    """Latest signal per symbol plus the sentinel's status, shared between processes."""
+
+    def __init__(self, path: str = DEFAULT_SENTINEL_DB):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")  # UI reads never block the writer
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def publish(self, signals: List[Dict], status: Dict):
+        """Upsert one cycle's signals and status in a single transaction."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO signals ({', '.join(_SIGNAL_COLUMNS)}) VALUES ({', '.join('?' * len(_SIGNAL_COLUMNS))})",
+                [tuple(s[c] for c in _SIGNAL_COLUMNS) for s in signals],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO status (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in status.items()],
+            )
+
+    def latest(self, limit: Optional[int] = None) -> List[Dict]:
+        """Most recently scanned signals first."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_SIGNAL_COLUMNS)} FROM signals ORDER BY scanned_at DESC LIMIT ?",
+                (limit if limit is not None else -1,),
+            ).fetchall()
+        return [dict(zip(_SIGNAL_COLUMNS, row)) for row in rows]
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {key: json.loads(value) for key, value in self._conn.execute("SELECT key, value FROM status")}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class Sentinel:
+    def __init__(self, symbols: List[str], store: SentinelStore, dispatcher: LLMDispatcher = None,
+                 journal: Optional[TradeJournal] = None, interval: float = SCAN_INTERVAL,
+                 fetch_news: Callable[[List[str]], Dict[str, str]] = fetch_live_news_sentiments,
+                 price_provider=None):
+        self.symbols = list(symbols)
+        self.store = store
+        self.dispatcher = dispatcher or get_dispatcher()
+        self.journal = journal
+        self.interval = interval
+        self.fetch_news = fetch_news
+        self.price_provider = price_provider
+        self.scheduler = ScanScheduler()
+        self.portfolio = Portfolio(persist=False)
+        self.cycles = 0
+
+    def _sync_holdings(self):
+        """Rebuild the working portfolio from the journal, keeping the sentiment EMA."""
+        port = Portfolio(persist=False, risk_level=self.portfolio.risk_level,
+                         raw_sentiment_ema=self.portfolio.raw_sentiment_ema)
+        if self.journal is not None and self.journal.has_state():
+            cash, _, positions = self.journal.load_state()
+            port.cash = cash
+            port.positions = {sym: Position(sym, shares, cost) for sym, (shares, cost) in positions.items()}
+        if self.price_provider is not None:
+            port.price_provider = self.price_provider
+        self.portfolio = port
+
+    def run_once(self) -> List[Dict]:
+        """One scan cycle; returns the signals it published."""
+        self._sync_holdings()
+        port = self.portfolio
+        watch = list(dict.fromkeys(self.symbols + list(port.positions)))
+        scan_symbols = self.scheduler.next_symbols(watch, held=port.positions,
+                                                   budget=self.dispatcher.budget(horizon=SCAN_TIMEOUT))
+        news = self.fetch_news(scan_symbols)
+        live_news = {sym: text for sym, text in news.items() if text and "Mock market news" not in text}
+        results = self.dispatcher.run(live_news, timeout=SCAN_TIMEOUT)
+        # symbols that missed the rate limit stay overdue and go first next cycle
+        self.scheduler.mark_scanned([sym for sym in scan_symbols if sym not in live_news or sym in results])
+
+        scores = {sym: results[sym].get("score", 0.0) for sym in live_news if sym in results}
+        for score in scores.values():
+            port.update_risk(score)
+        now = time.time()
+        signals = [
+            {
+                "symbol": o["symbol"],
+                "scanned_at": now,
+                "score": scores[o["symbol"]],
+                "summary": results[o["symbol"]].get("summary", ""),
+                "content": live_news[o["symbol"]][:CONTENT_CHARS],
+                "action": str(o["action"]),
+                "quantity": float(o["quantity"]),
+                "price": float(o["price"]),
+            }
+            for o in port.draft_orders(scores)
+        ]
+        self.cycles += 1
+        self.store.publish(signals, {
+            "last_cycle": now,
+            "interval": self.interval,
+            "scanned": scan_symbols,
+            "risk_level": port.risk_level,
+            "sentiment_ema": port.raw_sentiment_ema,
+            "cycles": self.cycles,
+            "pid": os.getpid(),
+        })
+        return signals
+
+    def run_forever(self, stop: threading.Event = None):
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            started = time.monotonic()
+            try:
+                with metrics.span("sentinel_cycle"):
+                    signals = self.run_once()
+                print(f"Sentinel cycle {self.cycles}: {len(signals)} signal(s)")
+            except Exception as e:
+                print(f"Sentinel cycle failed: {e}")
+            stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Headless news sentinel for SentiraTrader.")
+    parser.add_argument("--interval", type=float, default=SCAN_INTERVAL, help="seconds between scan cycles")
+    parser.add_argument("--symbols", default=None, help="comma-separated watchlist (default: built-in list)")
+    parser.add_argument("--db", default=DEFAULT_SENTINEL_DB, help="where to publish signals")
+    parser.add_argument("--journal", default=DEFAULT_JOURNAL_PATH, help="trade journal to read holdings from")
+    parser.add_argument("--once", action="store_true", help="run a single cycle and exit")
+    parser.add_argument("--metrics-port", type=int, default=None, help="serve /metrics on this port")
+    args = parser.parse_args(argv)
+    if args.metrics_port:
+        metrics.start_http_server(args.metrics_port)
+
+    symbols = args.symbols.split(",") if args.symbols else DEFAULT_WATCHLIST
+    sentinel = Sentinel(symbols, SentinelStore(args.db), journal=TradeJournal(args.journal),
+                        interval=args.interval, price_provider=get_shared_cache())
+    if args.once:
+        sentinel.run_once()
+        return
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    try:
+        sentinel.run_forever(stop)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Incremental ingestion of the social media feed file.
+
+``FeedTail`` remembers the byte offset it has read up to and on each poll
+seeks there and reads only what was appended since, so a refresh costs
+O(new posts) rather than O(file size). ``FeedAggregates`` folds scored
+posts into per-symbol running totals the same way, one post at a time.
+"""
+import os
+from typing import Dict, Iterable, List
+
+DEFAULT_FEED_PATH = "data/social_media.txt"
+TAIL_CHECK_BYTES = 64  # bytes before the offset re-read to tell an append from an in-place rewrite
+
+
+class FeedTail:
+    """Seek-based tail of an append-only text feed, one post per line.
+
+    Only newline-terminated lines are posts; a trailing line still being
+    written is held back until its newline arrives. If the file shrinks,
+    is replaced (new inode) or is rewritten in place (modified, and the
+    bytes just before the offset are no longer the ones read), reading
+    starts over and ``generation`` is bumped so consumers know to drop
+    what they derived from the old posts.
+    """
+
+    def __init__(self, path: str = DEFAULT_FEED_PATH):
+        self.path = path
+        self.posts: List[str] = []
+        self.offset = 0
+        self.generation = 0
+        self._partial = b""
+        self._file_id = None
+        self._mtime = None
+        self._tail = b""  # last bytes read, ending at offset
+
+    def poll(self) -> List[str]:
+        """Read newly appended posts, add them to ``posts`` and return them."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+        file_id = (st.st_dev, st.st_ino)
+        rewritten = st.st_mtime_ns != self._mtime and not self._tail_matches()
+        if file_id != self._file_id or st.st_size < self.offset or rewritten:
+            if self._file_id is not None:
+                self.reset()
+            self._file_id = file_id
+        self._mtime = st.st_mtime_ns
+        if st.st_size == self.offset:
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read(st.st_size - self.offset)
+        self.offset += len(chunk)
+        self._tail = (self._tail + chunk)[-TAIL_CHECK_BYTES:]
+        lines = (self._partial + chunk).split(b"\n")
+        self._partial = lines.pop()
+        new = self._decode(lines)
+        self.posts.extend(new)
+        return new
+
+    def _tail_matches(self) -> bool:
+        """True if the bytes before ``offset`` are still the ones last read (i.e. only appends happened)."""
+        if not self._tail:
+            return True
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.offset - len(self._tail))
+                return f.read(len(self._tail)) == self._tail
+        except OSError:
+            return False
+
+    def recent(self, n: int) -> List[str]:
+        return self.posts[-n:]
+
+    def reset(self):
+        self.posts = []
+        self.offset = 0
+        self._partial = b""
+        self._tail = b""
+        self.generation += 1
+
+    @staticmethod
+    def _decode(lines: Iterable[bytes]) -> List[str]:
+        posts = (line.decode("utf-8", errors="replace").strip() for line in lines)
+        return [post for post in posts if post]
+
+
+class FeedAggregates:
+    """Per-symbol running sentiment totals over a FeedTail's posts.
+
+    ``groups`` maps symbol -> {'posts': [...], 'total_score': float,
+    'count': int}; ``scored`` is how many of the tail's posts are folded in.
+    """
+
+    def __init__(self):
+        self.groups: Dict[str, Dict] = {}
+        self.scored = 0
+        self.generation = 0
+
+    def pending(self, tail: FeedTail) -> List[str]:
+        """Posts in ``tail`` not folded in yet (all of them if the tail restarted)."""
+        if tail.generation != self.generation:
+            self.reset()
+            self.generation = tail.generation
+        return tail.posts[self.scored:]
+
+    def add(self, post: str, score: float, summary: str, symbols: Iterable[str]):
+        for symbol in symbols:
+            group = self.groups.setdefault(symbol, {'posts': [], 'total_score': 0.0, 'count': 0})
+            group['posts'].append({'text': post, 'score': score, 'summary': summary})
+            group['total_score'] += score
+            group['count'] += 1
+        self.scored += 1
+
+    def average(self, symbol: str) -> float:
+        group = self.groups.get(symbol)
+        return group['total_score'] / group['count'] if group else 0.0
+
+    def reset(self):
+        self.groups = {}
+        self.scored = 0
@@ -0,0 +1,127 @@
+"""Parallel parameter sweeps over the backtest engine.
+
+A grid or random sample of (ema_alpha, entry_threshold,
+liquidation_threshold, risk_level) is fanned out over a process pool. The
+merged event stream is built once in the parent and placed in shared
+memory, so workers map the same arrays instead of each re-reading and
+re-sorting the dataset. Results come back as a ranked DataFrame.
+
+``risk_level`` is the starting risk level; update_risk takes over from the
+first sentiment event on.
+
+Usage: python sweep.py sentiment.csv bars.csv [--random N] [--workers N]
+"""
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backtest import EventStream, load_bars, load_sentiment, replay
+
+DEFAULT_GRID = {
+    "ema_alpha": [0.1, 0.2, 0.3, 0.5],
+    "entry_threshold": [0.2, 0.3, 0.4, 0.5],
+    "liquidation_threshold": [0.6, 0.7, 0.8, 0.9],
+    "risk_level": [0.5, 1.0],
+}
+DEFAULT_RANGES = {
+    "ema_alpha": (0.05, 0.6),
+    "entry_threshold": (0.1, 0.6),
+    "liquidation_threshold": (0.5, 0.95),
+    "risk_level": (0.25, 1.0),
+}
+_ARRAYS = ("times", "is_signal", "codes", "values")
+
+
+def grid(axes: Dict[str, Sequence[float]] = None) -> List[Dict[str, float]]:
+    """Every combination of the given axis values."""
+    axes = axes or DEFAULT_GRID
+    return [dict(zip(axes, combo)) for combo in itertools.product(*axes.values())]
+
+
+def random_search(n: int, ranges: Dict[str, Tuple[float, float]] = None, seed: int = 0) -> List[Dict[str, float]]:
+    """``n`` parameter sets drawn uniformly from ``ranges``."""
+    ranges = ranges or DEFAULT_RANGES
+    rng = np.random.default_rng(seed)
+    draws = {name: rng.uniform(lo, hi, n) for name, (lo, hi) in ranges.items()}
+    return [{name: float(values[i]) for name, values in draws.items()} for i in range(n)]
+
+
+class SharedEvents:
+    """Copies an EventStream's arrays into shared memory blocks owned by the parent."""
+
+    def __init__(self, events: EventStream):
+        self.blocks: List[shared_memory.SharedMemory] = []
+        layout = []
+        for name in _ARRAYS:
+            array = getattr(events, name)
+            block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+            self.blocks.append(block)
+            layout.append((block.name, array.shape, array.dtype.str))
+        self.spec = (layout, events.symbols)
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_events: EventStream = None
+_attached: List[shared_memory.SharedMemory] = []  # keeps the mappings alive in workers
+
+
+def _attach(spec):
+    """Pool initializer: view the parent's shared arrays without copying them."""
+    global _events
+    layout, symbols = spec
+    arrays = []
+    for name, shape, dtype in layout:
+        block = shared_memory.SharedMemory(name=name)
+        _attached.append(block)
+        arrays.append(np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf))
+    _events = EventStream(*arrays, symbols=symbols)
+
+
+def _evaluate(params: Dict[str, float]) -> Dict[str, float]:
+    return {**params, **replay(_events, **params).summary()}
+
+
+def sweep(events: EventStream, params: List[Dict[str, float]], workers: int = None,
+          rank_by: str = "total_return") -> pd.DataFrame:
+    """Backtest every parameter set in parallel and rank by ``rank_by`` (descending)."""
+    workers = workers or os.cpu_count() or 1
+    with SharedEvents(events) as shared:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(shared.spec,)) as pool:
+            rows = list(pool.map(_evaluate, params, chunksize=max(1, len(params) // (workers * 4))))
+    table = pd.DataFrame(rows).sort_values(rank_by, ascending=False, kind="stable").reset_index(drop=True)
+    table.index += 1
+    table.index.name = "rank"
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep backtest parameters over local data.")
+    parser.add_argument("sentiment", help="CSV with timestamp,symbol,score")
+    parser.add_argument("bars", help="CSV with timestamp,symbol,open,high,low,close")
+    parser.add_argument("--random", type=int, default=0, help="random search with N samples instead of the grid")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--rank-by", default="total_return")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    events = EventStream.from_frames(load_bars(args.bars), load_sentiment(args.sentiment))
+    params = random_search(args.random) if args.random else grid()
+    print(sweep(events, params, workers=args.workers, rank_by=args.rank_by).head(args.top).to_string())
@@ -0,0 +1,100 @@
+"""Incrementally maintained portfolio valuation.
+
+Instead of re-pricing every position whenever a total is needed, the
+engine keeps per-position market value and cost plus running portfolio
+totals, and adjusts them by the delta whenever a quote or a position
+changes. Reading totals is O(1) no matter how many positions are held.
+"""
+import threading
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional
+
+
+@dataclass
+class PositionValue:
+    symbol: str
+    shares: float = 0.0
+    cost_basis: float = 0.0
+    price: float = 0.0
+    day_change_pct: float = 0.0
+    realized_pnl: float = 0.0  # since session start; the portfolio total is restored from the journal
+
+    @property
+    def market_value(self) -> float:
+        return self.shares * self.price
+
+    @property
+    def cost(self) -> float:
+        return self.shares * self.cost_basis
+
+    @property
+    def unrealized_pnl(self) -> float:
+        return self.market_value - self.cost
+
+
+class ValuationEngine:
+    def __init__(self):
+        self._rows: Dict[str, PositionValue] = {}
+        self.market_value = 0.0
+        self.cost = 0.0
+        self.realized_pnl = 0.0
+        self._lock = threading.Lock()
+
+    def set_position(self, symbol: str, shares: float, cost_basis: float, price: Optional[float] = None):
+        """Record a position's new size and cost; shares <= 0 closes it.
+
+        ``price`` is only needed the first time a symbol is seen; afterwards
+        the last quote is kept.
+        """
+        with self._lock:
+            row = self._rows.get(symbol)
+            if row is not None:
+                self.market_value -= row.market_value
+                self.cost -= row.cost
+            elif shares > 0:
+                row = self._rows[symbol] = PositionValue(symbol, price=price or 0.0)
+            else:
+                return
+            if price is not None:
+                row.price = price
+            row.shares = max(0.0, shares)
+            row.cost_basis = cost_basis if shares > 0 else 0.0
+            self.market_value += row.market_value
+            self.cost += row.cost
+            if row.shares == 0 and row.realized_pnl == 0:
+                del self._rows[symbol]
+
+    def update_quote(self, symbol: str, price: float, day_change_pct: float = 0.0):
+        """Apply a new quote. Quotes for symbols not held are ignored."""
+        with self._lock:
+            row = self._rows.get(symbol)
+            if row is None or row.shares == 0:
+                return
+            self.market_value += row.shares * (price - row.price)
+            row.price = price
+            row.day_change_pct = day_change_pct
+
+    def realize(self, symbol: str, pnl: float):
+        """Book realized profit or loss from a sale."""
+        with self._lock:
+            row = self._rows.setdefault(symbol, PositionValue(symbol))
+            row.realized_pnl += pnl
+            self.realized_pnl += pnl
+
+    def price_of(self, symbol: str) -> Optional[float]:
+        row = self._rows.get(symbol)
+        return row.price if row is not None and row.shares > 0 else None
+
+    def totals(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "market_value": self.market_value,
+                "cost": self.cost,
+                "unrealized_pnl": self.market_value - self.cost,
+                "realized_pnl": self.realized_pnl,
+            }
+
+    def rows(self) -> List[PositionValue]:
+        """Copies of every open position's valuation."""
+        with self._lock:
+            return [replace(row) for row in self._rows.values() if row.shares > 0]